@@ -0,0 +1,346 @@
+'''
+asyncio driver for the game engine.
+
+Runs many matches concurrently in one process and one thread: every pokerbot is an
+asyncio subprocess, talks over an asyncio stream, and has its output drained by a task
+instead of a daemon thread. Messages, game clocks, logs and results are the same as
+engine.Game, which supplies the game logic. Python bots always run as subprocesses here.
+
+    python3 async_engine.py 50 16    plays 50 matches, at most 16 at a time, into OUTPUT_DIR/match_#
+'''
+import asyncio
+import os
+import socket
+import sys
+import tempfile
+import time
+
+from config import *
+from engine import Game, Player, RoundState, CHECK_ONLY, is_python_bot, OUTPUT_CHUNK_SIZE, STATUS, STATUS_TOTALS
+
+OUTPUT_DIR = 'matches'
+# seconds between checks on a build cache entry that another match is building
+BUILD_LOCK_POLL = 0.05
+
+
+class AsyncPlayer(Player):
+    '''
+    Handles asyncio subprocess and stream interactions with one player's pokerbot.
+    The methods that touch the pokerbot are coroutines.
+    '''
+
+    def __init__(self, name, path, output_dir='.', quiet=False):
+        super().__init__(name, path, output_dir, quiet)
+        self.reader = None
+        self.writer = None
+        self.output_task = None
+
+    async def build(self):
+        '''
+        Loads the commands file and builds the pokerbot, using the build cache as Player.build does.
+        '''
+        self.load_commands()
+        if self.commands is not None and len(self.commands['build']) > 0:
+            cache = self.build_cache()
+            built = False
+            try:
+                if cache is not None:
+                    # another match in this process may be building the same copy, so never block the loop
+                    while not cache.lock(blocking=False):
+                        await asyncio.sleep(BUILD_LOCK_POLL)
+                    if cache.prepare():
+                        self.output_buffer.put(('Using the cached build in ' + cache.directory + '\n').encode())
+                        return
+                proc = await asyncio.create_subprocess_exec(*self.commands['build'],
+                                                            stdout=asyncio.subprocess.PIPE,
+                                                            stderr=asyncio.subprocess.STDOUT, cwd=self.run_dir,
+                                                            env=dict(os.environ, BUILD_TYPE=BUILD_TYPE))
+                try:
+                    outs, _ = await asyncio.wait_for(proc.communicate(), BUILD_TIMEOUT)
+                    self.output_buffer.put(outs)
+                    built = proc.returncode == 0
+                except asyncio.TimeoutError:
+                    proc.kill()
+                    await proc.wait()
+                    error_message = 'Timed out waiting for ' + self.name + ' to build'
+                    print(error_message)
+                    self.output_buffer.put(error_message.encode())
+            except (TypeError, ValueError):
+                print(self.name, 'build command misformatted')
+            except OSError:
+                print(self.name, 'build failed - check "build" in commands.json')
+            finally:
+                if cache is not None:
+                    cache.unlock(built)
+
+    async def run(self):
+        '''
+        Runs the pokerbot and establishes the stream connection over the transport Player.run would use.
+        '''
+        if self.commands is None or len(self.commands['run']) == 0:
+            return
+        connection = asyncio.get_running_loop().create_future()
+
+        def on_connect(reader, writer):
+            if connection.done():
+                writer.close()
+            else:
+                connection.set_result((reader, writer))
+        server = None
+        transport = self.transport()
+        try:
+            with tempfile.TemporaryDirectory() as socket_dir:
+                if transport == 'socketpair':
+                    client_socket, bot_socket = socket.socketpair()
+                    with bot_socket:
+                        await self.launch('fd:' + str(bot_socket.fileno()), (bot_socket.fileno(),))
+                    connection.set_result(await asyncio.open_connection(sock=client_socket))
+                elif transport == 'unix':
+                    address = os.path.join(socket_dir, 'engine.sock')
+                    server = await asyncio.start_unix_server(on_connect, address)
+                    await self.launch('unix:' + address)
+                else:
+                    # bind one socket as Player.run does; letting asyncio bind would open one port per address family
+                    server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                    server_socket.bind(('', 0))
+                    server = await asyncio.start_server(on_connect, sock=server_socket)
+                    await self.launch(str(server_socket.getsockname()[1]))
+                # block until we timeout or the player connects
+                self.reader, self.writer = await asyncio.wait_for(connection, CONNECT_TIMEOUT)
+                if transport == 'socketpair':
+                    # the pokerbot says it is ready once loaded, as accepting a connection would
+                    if await asyncio.wait_for(self.reader.readline(), CONNECT_TIMEOUT) != b'K\n':
+                        raise asyncio.TimeoutError
+                elif transport == 'tcp':
+                    self.writer.get_extra_info('socket').setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            if not self.quiet:
+                print(self.name, 'connected successfully')
+        except (TypeError, ValueError):
+            print(self.name, 'run command misformatted')
+        except asyncio.TimeoutError:
+            self.reader = self.writer = None
+            print('Timed out waiting for', self.name, 'to connect')
+        except OSError:
+            print(self.name, 'run failed - check "run" in commands.json')
+        finally:
+            if server is not None:
+                server.close()
+
+    async def launch(self, address, pass_fds=()):
+        '''
+        Starts the pokerbot's process, telling it where to connect, and drains its output.
+        '''
+        self.bot_subprocess = await asyncio.create_subprocess_exec(*self.commands['run'], address,
+                                                                   stdout=asyncio.subprocess.PIPE,
+                                                                   stderr=asyncio.subprocess.STDOUT,
+                                                                   cwd=self.run_dir, pass_fds=pass_fds)
+        self.output_task = asyncio.ensure_future(self.read_output(self.bot_subprocess.stdout))
+
+    async def read_output(self, stream):
+        '''
+        Drains the pokerbot's output into its output buffer in large chunks.
+        '''
+        while True:
+            chunk = await stream.read(OUTPUT_CHUNK_SIZE)
+            if not chunk:
+                break
+            self.output_buffer.put(chunk)
+
+    async def stop(self):
+        '''
+        Closes the stream connection and stops the pokerbot.
+        '''
+        if self.writer is not None:
+            try:
+                self.writer.write(b'Q\n')
+                await self.writer.drain()
+                self.writer.close()
+            except OSError:
+                print('Could not close socket connection with', self.name)
+            self.reader = self.writer = None
+        if self.bot_subprocess is not None:
+            try:
+                await asyncio.wait_for(self.bot_subprocess.wait(), CONNECT_TIMEOUT)
+            except asyncio.TimeoutError:
+                print('Timed out waiting for', self.name, 'to quit')
+                self.bot_subprocess.kill()
+                await self.bot_subprocess.wait()
+        if self.output_task is not None:
+            await self.output_task
+        with open(os.path.join(self.output_dir, self.name + '.txt'), 'wb') as log_file:
+            self.output_buffer.write_to(log_file)
+
+    def connected(self):
+        return self.writer is not None
+
+    async def exchange(self, player_message):
+        '''
+        Sends one message to the pokerbot and returns its response clause.
+        '''
+        self.writer.write((' '.join(player_message) + '\n').encode())
+        await self.writer.drain()
+        line = await asyncio.wait_for(self.reader.readline(), CONNECT_TIMEOUT)
+        return line.decode().strip()
+
+    async def new_game(self):
+        '''
+        Readies the pokerbot's process for another game, as Player.new_game does.
+        '''
+        if not self.connected() or self.game_clock <= 0.:
+            return False
+        self.game_clock = STARTING_GAME_CLOCK
+        self.wall_clock = CPU_GAME_CLOCK_WALL_CAP
+        self.bankroll = 0
+        self.timeouts = 0
+        self.illegal_actions = 0
+        self.latency_stats = {}
+        if not is_python_bot(self.path):
+            fresh, self.fresh = self.fresh, False
+            return fresh
+        try:
+            return await self.exchange(['G']) == 'K'
+        except (OSError, asyncio.TimeoutError):
+            return False
+
+    async def query(self, round_state, player_message, game_log):
+        '''
+        Requests one action from the pokerbot, as Player.query does.
+        '''
+        legal_actions = round_state.legal_actions() if isinstance(round_state, RoundState) else CHECK_ONLY
+        self.latency = None
+        action = None
+        if self.connected() and self.game_clock > 0.:
+            clause = ''
+            try:
+                player_message[0] = 'T{:.3f}'.format(self.game_clock)
+                start_cpu = self.cpu_time() if CPU_GAME_CLOCK else None
+                start_time = time.perf_counter()
+                clause = await self.exchange(player_message)
+                end_time = time.perf_counter()
+                self.latency = end_time - start_time
+                del player_message[1:]  # do not send redundant action history
+                self.charge_clock(start_cpu, start_time, end_time)
+                action = self.decode(clause, round_state, legal_actions, game_log)
+            except (socket.timeout, asyncio.TimeoutError):
+                self.timeouts += 1
+                self.drop(self.name + ' ran out of time', [game_log])
+            except OSError:
+                self.drop(self.name + ' disconnected', [game_log])
+            except (IndexError, KeyError, ValueError) as error:
+                self.misformatted(clause, error, game_log)
+        else:
+            del player_message[1:]  # a dropped pokerbot is sent nothing more
+        if action is None:
+            action = self.default_action(legal_actions)
+        if self.latency is not None:
+            self.record_latency(round_state, action, self.latency)
+        return action
+
+
+async def start_player(name, path, output_dir='.', quiet=False):
+    '''
+    Creates, builds and launches one pokerbot.
+    '''
+    player = AsyncPlayer(name, path, output_dir, quiet)
+    await player.build()
+    await player.run()
+    return player
+
+
+async def start_players(output_dir='.', quiet=False):
+    '''
+    Creates, builds and launches both pokerbots named in config.py.
+    '''
+    return list(await asyncio.gather(start_player(PLAYER_1_NAME, PLAYER_1_PATH, output_dir, quiet),
+                                     start_player(PLAYER_2_NAME, PLAYER_2_PATH, output_dir, quiet)))
+
+
+class AsyncGame(Game):
+    '''
+    Drives Game's round generator with coroutine queries, so that any number of games
+    can share one event loop. Decisions that do not depend on each other, such as sealed
+    bids with CONCURRENT_QUERIES and end-of-round acks, are awaited together.
+    '''
+
+    async def run_round(self, players, round_num):
+        '''
+        Runs one round of poker (1 hand).
+        '''
+        round_generator = self.play_round(players, round_num)
+        requests = next(round_generator)
+        while True:
+            actions = await asyncio.gather(*[players[seat].query(round_state, self.player_messages[seat], self.log)
+                                             for seat, round_state in requests])
+            try:
+                requests = round_generator.send(actions)
+            except StopIteration:
+                return
+
+    async def run(self, players=None):
+        '''
+        Runs one game of poker and returns its GameResult, as Game.run does.
+        '''
+        if not self.quiet:
+            self.print_banner()
+        persistent = players is not None
+        if players is None:
+            players = await start_players(self.output_dir, self.quiet)
+        else:
+            for i, player in enumerate(players):
+                if not await player.new_game():
+                    print(player.name, 'could not be reused - restarting')
+                    await player.stop()
+                    players[i] = await start_player(player.name, player.path, player.output_dir, player.quiet)
+                    players[i].fresh = False
+            players = list(players)
+        if self.swap_seats:
+            players = players[::-1]
+        self.concurrent_auction = CONCURRENT_QUERIES
+        for round_num in range(1, NUM_ROUNDS + 1):
+            self.log.append('')
+            self.log.append('Round #' + str(round_num) + STATUS(players))
+            await self.run_round(players, round_num)
+            players = players[::-1]
+            if round_num % GAME_LOG_FLUSH_ROUNDS == 0:
+                self.log.flush()
+            if SOAK_MODE:
+                self.soak(players, round_num)
+        if not persistent:
+            await asyncio.gather(*[player.stop() for player in players])
+        return self.finish(players)
+
+
+async def run_tournament(num_matches, max_concurrent, output_dir=OUTPUT_DIR, seed=None):
+    '''
+    Plays num_matches quiet matches, at most max_concurrent at once, each with its own
+    pair of pokerbot processes and its logs in output_dir/match_#. Returns their GameResults.
+    '''
+    semaphore = asyncio.Semaphore(max_concurrent)
+
+    async def run_match(match_num):
+        async with semaphore:
+            match_dir = os.path.join(output_dir, 'match_' + str(match_num))
+            os.makedirs(match_dir, exist_ok=True)
+            game = AsyncGame(match_dir, None if seed is None else seed + match_num, quiet=True)
+            return await game.run()
+    return await asyncio.gather(*[run_match(match_num) for match_num in range(1, num_matches + 1)])
+
+
+def run_matches(num_matches, max_concurrent, output_dir=OUTPUT_DIR, seed=None):
+    '''
+    Runs run_tournament on a new event loop and returns its results.
+    '''
+    # before Python 3.12, asyncio waits on each subprocess from a thread of its own unless told to use pidfds
+    if sys.version_info < (3, 12) and hasattr(asyncio, 'PidfdChildWatcher') and hasattr(os, 'pidfd_open'):
+        asyncio.set_child_watcher(asyncio.PidfdChildWatcher())
+    return asyncio.run(run_tournament(num_matches, max_concurrent, output_dir, seed))
+
+
+if __name__ == '__main__':
+    num_matches = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    max_concurrent = int(sys.argv[2]) if len(sys.argv) > 2 else num_matches
+    start_time = time.perf_counter()
+    results = run_matches(num_matches, max_concurrent, seed=GAME_SEED)
+    totals = {name: sum(result.bankrolls[name] for result in results) for name in results[0].bankrolls}
+    print('Played', num_matches, 'matches in {:.1f}s, total'.format(time.perf_counter() - start_time) +
+          STATUS_TOTALS(totals))
@@ -0,0 +1,260 @@
+'''
+Vectorized batch simulator for tuning pokerbot parameters.
+
+Plays many independent hands of the auction variant in lockstep with NumPy arrays.
+Bots are policy functions over a batch of observations instead of skeleton Bots,
+so thresholds can be swept over millions of hands without sockets or the engine.
+The rules mirror engine.RoundState: proceed, raise_bounds and bid_bounds.
+'''
+from collections import namedtuple
+import numpy as np
+import eval7
+
+from config import STARTING_STACK, BIG_BLIND, SMALL_BLIND
+
+# action codes returned by policies
+FOLD, CALL, CHECK, RAISE, BID = range(5)
+NUM_ACTIONS = 5
+
+# card ids are rank * 4 + suit in eval7 order, so 0 is 2c and 51 is As
+CARDS = [eval7.Card(rank + suit) for rank in '23456789TJQKA' for suit in 'cdhs']
+CARD_STRINGS = [str(card) for card in CARDS]
+NO_CARD = -1
+NO_BID = -1
+
+# Fields are arrays over the hands in the batch, seen from the acting player's seat:
+# active        the acting player's index (0 posts the small blind)
+# street        0, 3, 4 or 5
+# auction       True while bids are being collected
+# hand          (n, 3) hole cards, the third is the auction card or NO_CARD
+# board         (n, 5) community cards, NO_CARD for cards not yet revealed
+# my_pip, opp_pip, my_stack, opp_stack
+# my_bid, opp_bid  NO_BID until both bids are in
+# legal         (n, NUM_ACTIONS) mask of legal action codes
+# min_raise, max_raise, max_bid
+Observation = namedtuple('Observation', ['active', 'street', 'auction', 'hand', 'board', 'my_pip', 'opp_pip',
+                                         'my_stack', 'opp_stack', 'my_bid', 'opp_bid', 'legal',
+                                         'min_raise', 'max_raise', 'max_bid'])
+
+
+class HandBatch():
+    '''
+    The state of n hands in progress, one row per hand, indexed by seat.
+    '''
+
+    def __init__(self, decks):
+        n = len(decks)
+        self.decks = decks
+        self.rows = np.arange(n)
+        self.button = np.zeros(n, dtype=np.int64)
+        self.street = np.zeros(n, dtype=np.int64)
+        self.auction = np.zeros(n, dtype=bool)
+        self.bids = np.full((n, 2), NO_BID, dtype=np.int64)
+        self.pips = np.tile(np.array([SMALL_BLIND, BIG_BLIND], dtype=np.int64), (n, 1))
+        self.stacks = STARTING_STACK - self.pips
+        # the engine deals hole cards off the top of the deck, then peeks the board
+        self.hands = np.full((n, 2, 3), NO_CARD, dtype=np.int64)
+        self.hands[:, 0, :2] = decks[:, 0:2]
+        self.hands[:, 1, :2] = decks[:, 2:4]
+        self.board = decks[:, 4:9]
+        self.done = np.zeros(n, dtype=bool)
+        self.deltas = np.zeros((n, 2), dtype=np.int64)
+
+    def legal_mask(self, rows, active):
+        '''
+        Returns the legal action mask and bet bounds for the given hands, as RoundState would.
+        '''
+        pips, stacks = self.pips[rows], self.stacks[rows]
+        my_pip, opp_pip = pips[np.arange(len(rows)), active], pips[np.arange(len(rows)), 1 - active]
+        my_stack, opp_stack = stacks[np.arange(len(rows)), active], stacks[np.arange(len(rows)), 1 - active]
+        continue_cost = opp_pip - my_pip
+        auction = self.auction[rows]
+        betting = ~auction
+        owes = continue_cost > 0
+        legal = np.zeros((len(rows), NUM_ACTIONS), dtype=bool)
+        legal[:, BID] = auction
+        legal[:, CHECK] = betting & ~owes
+        legal[:, FOLD] = betting & owes
+        legal[:, CALL] = betting & owes
+        bets_allowed = (stacks[:, 0] > 0) & (stacks[:, 1] > 0)
+        raises_allowed = (continue_cost < my_stack) & (opp_stack > 0)
+        legal[:, RAISE] = betting & np.where(owes, raises_allowed, bets_allowed)
+        max_contribution = np.minimum(my_stack, opp_stack + continue_cost)
+        min_contribution = np.minimum(max_contribution, continue_cost + np.maximum(continue_cost, BIG_BLIND))
+        return legal, my_pip + min_contribution, my_pip + max_contribution, my_stack
+
+    def observe(self, rows, active):
+        '''
+        Builds the acting player's Observation for the given hands.
+        '''
+        legal, min_raise, max_raise, max_bid = self.legal_mask(rows, active)
+        index = np.arange(len(rows))
+        street = self.street[rows]
+        board = np.where(np.arange(5) < street[:, None], self.board[rows], NO_CARD)
+        bids = self.bids[rows]
+        return Observation(active, street, self.auction[rows], self.hands[rows, active], board,
+                           self.pips[rows, active], self.pips[rows, 1 - active],
+                           self.stacks[rows, active], self.stacks[rows, 1 - active],
+                           bids[index, active], bids[index, 1 - active], legal,
+                           min_raise, max_raise, max_bid), legal, min_raise, max_raise, max_bid
+
+    def validate(self, actions, amounts, legal, min_raise, max_raise, max_bid):
+        '''
+        Replaces illegal actions the way engine.Player.query does:
+        a bid of 0 in the auction, otherwise a check if possible and a fold if not.
+        '''
+        actions = np.asarray(actions, dtype=np.int64)
+        amounts = np.asarray(amounts, dtype=np.int64)
+        index = np.arange(len(actions))
+        in_range = (actions >= 0) & (actions < NUM_ACTIONS)
+        ok = in_range & legal[index, np.where(in_range, actions, 0)]
+        ok &= np.where(actions == RAISE, (min_raise <= amounts) & (amounts <= max_raise), True)
+        ok &= np.where(actions == BID, (0 <= amounts) & (amounts <= max_bid), True)
+        fallback = np.where(legal[:, BID], BID, np.where(legal[:, CHECK], CHECK, FOLD))
+        return np.where(ok, actions, fallback), np.where(ok, amounts, 0)
+
+    def proceed_street(self, rows):
+        '''
+        Resets pips and advances to the next round of betting, or shows down after the river.
+        '''
+        river = self.street[rows] == 5
+        self.showdown(rows[river])
+        rows = rows[~river]
+        self.button[rows] = 1
+        self.pips[rows] = 0
+        flop = self.street[rows] == 0
+        self.street[rows] = np.where(flop, 3, self.street[rows] + 1)
+        self.auction[rows[flop]] = True
+
+    def showdown(self, rows):
+        '''
+        Compares the players' hands and computes payoffs.
+        '''
+        for row in rows:
+            board = [CARDS[card] for card in self.board[row]]
+            score0 = eval7.evaluate(board + [CARDS[card] for card in self.hands[row, 0] if card != NO_CARD])
+            score1 = eval7.evaluate(board + [CARDS[card] for card in self.hands[row, 1] if card != NO_CARD])
+            stacks = self.stacks[row]
+            if score0 > score1:
+                delta = STARTING_STACK - stacks[1]
+            elif score0 < score1:
+                delta = stacks[0] - STARTING_STACK
+            else:  # split the pot
+                delta = (stacks[0] - stacks[1]) // 2
+            self.deltas[row] = (delta, -delta)
+        self.done[rows] = True
+
+    def proceed(self, rows, active, actions, amounts):
+        '''
+        Advances the given hands by one (legal) action of their active player.
+        '''
+        other = 1 - active
+        stacks, pips = self.stacks, self.pips
+
+        fold = actions == FOLD
+        fold_rows, fold_active = rows[fold], active[fold]
+        delta = np.where(fold_active == 0, stacks[fold_rows, 0] - STARTING_STACK, STARTING_STACK - stacks[fold_rows, 1])
+        self.deltas[fold_rows, 0] = delta
+        self.deltas[fold_rows, 1] = -delta
+        self.done[fold_rows] = True
+
+        call = actions == CALL
+        limp = call & (self.button[rows] == 0)  # sb calls bb preflop
+        limp_rows = rows[limp]
+        self.button[limp_rows] = 1
+        pips[limp_rows] = BIG_BLIND
+        stacks[limp_rows] = STARTING_STACK - BIG_BLIND
+        call &= ~limp
+        call_rows, call_active, call_other = rows[call], active[call], other[call]
+        contribution = pips[call_rows, call_other] - pips[call_rows, call_active]
+        stacks[call_rows, call_active] -= contribution
+        pips[call_rows, call_active] += contribution
+        self.button[call_rows] += 1
+
+        check = actions == CHECK
+        check_rows = rows[check]
+        both_acted = ((self.street[check_rows] == 0) & (self.button[check_rows] > 0)) | (self.button[check_rows] > 1)
+        self.button[check_rows[~both_acted]] += 1
+
+        raise_ = actions == RAISE
+        raise_rows, raise_active = rows[raise_], active[raise_]
+        contribution = amounts[raise_] - pips[raise_rows, raise_active]
+        stacks[raise_rows, raise_active] -= contribution
+        pips[raise_rows, raise_active] += contribution
+        self.button[raise_rows] += 1
+
+        bid = actions == BID
+        bid_rows, bid_active = rows[bid], active[bid]
+        self.bids[bid_rows, bid_active] = amounts[bid]
+        resolved = (self.bids[bid_rows] != NO_BID).all(axis=1)
+        self.button[bid_rows[~resolved]] += 1
+        self.resolve_auction(bid_rows[resolved])
+
+        self.proceed_street(np.concatenate([call_rows, check_rows[both_acted]]))
+
+    def resolve_auction(self, rows):
+        '''
+        Deals the auction card(s) and charges the second price, splitting on ties.
+        '''
+        bids = self.bids[rows]
+        decks = self.decks[rows]
+        tie = bids[:, 0] == bids[:, 1]
+        # the auction cards are the last two of the 48 left after dealing hole cards
+        tie_rows = rows[tie]
+        self.hands[tie_rows, 0, 2] = decks[tie, 51]
+        self.hands[tie_rows, 1, 2] = decks[tie, 50]
+        self.stacks[tie_rows] -= bids[tie]
+        win_rows = rows[~tie]
+        winner = np.where(bids[~tie, 0] > bids[~tie, 1], 0, 1)
+        self.hands[win_rows, winner, 2] = decks[~tie, 51]
+        self.stacks[win_rows, winner] -= bids[~tie][np.arange(len(win_rows)), 1 - winner]
+        self.button[rows] = 1
+        self.auction[rows] = False
+
+
+def simulate(policies, num_hands, seed=None):
+    '''
+    Plays num_hands independent hands between two policies and returns an (num_hands, 2)
+    array of bankroll deltas, indexed by policy. Seats alternate between hands as in the engine,
+    so the first policy posts the small blind in even-numbered hands.
+
+    A policy takes an Observation over the hands where it is to act and returns
+    a pair of arrays (action codes, amounts); amounts are only read for RAISE and BID.
+    '''
+    rng = np.random.default_rng(seed)
+    batch = HandBatch(rng.permuted(np.tile(np.arange(52), (num_hands, 1)), axis=1))
+    swapped = batch.rows % 2  # the policy in seat s of hand i is (s + i) % 2
+    while True:
+        rows = np.flatnonzero(~batch.done)
+        if len(rows) == 0:
+            break
+        active = batch.button[rows] % 2
+        actor = (active + swapped[rows]) % 2
+        for p, policy in enumerate(policies):
+            mine = actor == p
+            if not mine.any():
+                continue
+            policy_rows, policy_active = rows[mine], active[mine]
+            observation, legal, min_raise, max_raise, max_bid = batch.observe(policy_rows, policy_active)
+            actions, amounts = policy(observation)
+            actions, amounts = batch.validate(actions, amounts, legal, min_raise, max_raise, max_bid)
+            batch.proceed(policy_rows, policy_active, actions, amounts)
+    deltas = batch.deltas.copy()
+    deltas[swapped == 1] = deltas[swapped == 1][:, ::-1]
+    return deltas
+
+
+def check_call_policy(observation):
+    '''
+    Example policy: never raises, calls any bet, and bids a fixed 2 chips in the auction.
+    '''
+    legal = observation.legal
+    actions = np.where(legal[:, BID], BID, np.where(legal[:, CHECK], CHECK, CALL))
+    return actions, np.full(len(actions), 2)
+
+
+if __name__ == '__main__':
+    import time
+    start_time = time.perf_counter()
+    deltas = simulate([check_call_policy, check_call_policy], 100000, seed=0)
+    print('Simulated', len(deltas), 'hands in {:.2f}s, bankrolls'.format(time.perf_counter() - start_time), deltas.sum(axis=0))
@@ -5,13 +5,59 @@ PLAYER_1_PATH = './python_FINAL_v5'
 # NO TRAILING SLASHES ARE ALLOWED IN PATHS
 PLAYER_2_NAME = 'B'
 PLAYER_2_PATH = './python_asdf_v0'
+# LOAD PYTHON BOTS (DIRECTORIES WITH A player.py) INTO THE ENGINE PROCESS
+# INSTEAD OF LAUNCHING THEM OVER commands.json AND A SOCKET
+IN_PROCESS_PLAYERS = False
+# FIX EVERY ROUND'S DECK WITH AN INTEGER SEED, OR None FOR RANDOM DECKS
+GAME_SEED = None
+# PLAY THE SAME DECKS TWICE WITH SEATS SWAPPED AND REPORT THE PAIRED RESULT
+DUPLICATE_MODE = False
+# REQUEST SEALED AUCTION BIDS AND END-OF-ROUND ACKS FROM BOTH BOTS AT ONCE
+# REQUIRES A SKELETON RUNNER THAT ACCEPTS A BID REQUEST OUT OF TURN
+CONCURRENT_QUERIES = False
+# HOW THE ENGINE REACHES PYTHON BOTS: 'tcp' (LOCALHOST PORT), 'unix' (UNIX DOMAIN SOCKET)
+# OR 'socketpair' (A CONNECTED SOCKET INHERITED BY THE BOT PROCESS); OTHER BOTS ALWAYS USE TCP
+TRANSPORT = 'tcp'
+# SEND EACH ROUND'S RESULT WITH THE NEXT ROUND'S FIRST MESSAGE INSTEAD OF WAITING FOR AN ACK,
+# SAVING TWO ROUND TRIPS PER ROUND; THE BOT'S handle_round_over RUNS JUST BEFORE handle_new_round
+PIGGYBACK_ROUND_OVER = False
+# PLAY THIS MANY INDEPENDENT TABLES AT ONCE OVER ONE PAIR OF BOT CONNECTIONS
+NUM_TABLES = 1
 # GAME PROGRESS IS RECORDED HERE
 GAME_LOG_FILENAME = 'gamelog'
+# GAME LOG COMPRESSION: None, 'gzip' OR 'zstd' (NEEDS THE zstandard PACKAGE)
+GAME_LOG_COMPRESSION = None
+# THE GAME LOG IS STREAMED TO DISK AND FLUSHED EVERY GAME_LOG_FLUSH_ROUNDS ROUNDS
+GAME_LOG_FLUSH_ROUNDS = 1
+# SOAK MODE FOR VERY LONG MATCHES (RAISE STARTING_GAME_CLOCK ALONG WITH NUM_ROUNDS):
+# NO PER-ROUND RESULTS ARE KEPT IN MEMORY, THE GAME LOG STARTS A NEW FILE EVERY
+# SOAK_LOG_ROUNDS ROUNDS KEEPING ONLY THE LAST SOAK_LOG_FILES, AND BANKROLLS, CLOCK USAGE
+# AND BOT MEMORY ARE WRITTEN TO gamelog_checkpoints.csv EVERY SOAK_CHECKPOINT_ROUNDS ROUNDS
+SOAK_MODE = False
+SOAK_LOG_ROUNDS = 10000
+SOAK_LOG_FILES = 3
+SOAK_CHECKPOINT_ROUNDS = 10000
 # PLAYER_LOG_SIZE_LIMIT IS IN BYTES
+# THE FIRST PLAYER_LOG_SIZE_LIMIT AND LAST PLAYER_LOG_TAIL_SIZE BYTES OF EACH
+# BOT'S OUTPUT ARE KEPT; THE NUMBER OF BYTES DROPPED IN BETWEEN IS RECORDED
 PLAYER_LOG_SIZE_LIMIT = 524288
+PLAYER_LOG_TAIL_SIZE = 65536
 # STARTING_GAME_CLOCK AND TIMEOUTS ARE IN SECONDS
 ENFORCE_GAME_CLOCK = True
 STARTING_GAME_CLOCK = 30.
+# CHARGE THE GAME CLOCK WITH THE CPU TIME OF THE BOT PROCESS (LINUX /proc)
+# INSTEAD OF WALL-CLOCK TIME, SO SCHEDULER DELAY ON A LOADED MACHINE IS FREE
+CPU_GAME_CLOCK = False
+# IN CPU CLOCK MODE, THE BOT STILL TIMES OUT AFTER THIS MUCH TOTAL WALL TIME
+CPU_GAME_CLOCK_WALL_CAP = 120.
+# DECISION LATENCY PERCENTILES ARE WRITTEN TO gamelog_latency.csv; A DECISION COUNTS AS NEAR THE
+# CLOCK BUDGET WHEN IT TAKES AT LEAST THIS FRACTION OF STARTING_GAME_CLOCK / NUM_ROUNDS
+NEAR_BUDGET_FRACTION = 0.8
+# BOTS WITH A BUILD STEP ARE COPIED TO BUILD_CACHE_DIR, KEYED BY A HASH OF THEIR FILES AND BUILD_TYPE,
+# BUILT ONCE THERE AND RUN FROM THE COPY UNTIL THEY CHANGE; None BUILDS IN PLACE BEFORE EVERY MATCH
+BUILD_CACHE_DIR = '.build_cache'
+# PASSED TO BUILD COMMANDS AS $BUILD_TYPE; cpp_skeleton/build.sh USES IT AS CMAKE_BUILD_TYPE ('Debug' OR 'Release')
+BUILD_TYPE = 'Debug'
 BUILD_TIMEOUT = 10.
 CONNECT_TIMEOUT = 10.
 # THE GAME VARIANT FIXES THE PARAMETERS BELOW
@@ -1,7 +1,8 @@
 #!/bin/bash
+set -e
 
 mkdir -p build
 cd build
-cmake -DCMAKE_BUILD_TYPE=Debug ..
+cmake -DCMAKE_BUILD_TYPE=${BUILD_TYPE:-Debug} ..
 make
 cd ..
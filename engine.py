@@ -19,12 +19,23 @@ each of the skeleton bot files accordingly
 '''
 
 from collections import namedtuple
-from threading import Thread
-from queue import Queue
+import contextlib
+from threading import Thread, Lock
+from concurrent.futures import ThreadPoolExecutor
+from itertools import combinations
+import importlib.util
+import gzip
+import hashlib
+import io
+import math
+import traceback
+import random
 import time
 import json
 import subprocess
+import shutil
 import socket
+import tempfile
 import eval7
 import sys
 import os
@@ -32,6 +43,11 @@ import os
 sys.path.append(os.getcwd())
 from config import *
 
+try:
+    import fcntl
+except ImportError:  # without file locks, concurrent builds of the same bot are not serialized
+    fcntl = None
+
 FoldAction = namedtuple('FoldAction', [])
 CallAction = namedtuple('CallAction', [])
 CheckAction = namedtuple('CheckAction', [])
@@ -39,6 +55,13 @@ CheckAction = namedtuple('CheckAction', [])
 RaiseAction = namedtuple('RaiseAction', ['amount'])
 BidAction = namedtuple('BidAction', ['amount'])
 TerminalState = namedtuple('TerminalState', ['deltas', 'bids', 'previous_state'])
+# each field is a dict keyed by player name; deltas holds the list of per-round bankroll deltas
+# adjusted_bankrolls replaces the outcome of every all-in hand with its expected value
+# latencies maps each player's name to a dict of LatencySummary by (street, decision, action)
+GameResult = namedtuple('GameResult', ['bankrolls', 'deltas', 'timeouts', 'illegal_actions', 'adjusted_bankrolls',
+                                       'latencies'])
+# latencies are in seconds; near_budget counts decisions of at least NEAR_BUDGET_FRACTION of the clock per round
+LatencySummary = namedtuple('LatencySummary', ['count', 'mean', 'p50', 'p95', 'p99', 'max', 'near_budget'])
 
 # will not include a "bid" street as a community card is not being revealed to the players
 STREET_NAMES = ['Flop', 'Turn', 'River']
@@ -47,6 +70,17 @@ CCARDS = lambda cards: ','.join(map(str, cards))
 PCARDS = lambda cards: '[{}]'.format(' '.join(map(str, cards)))
 PVALUE = lambda name, value: ', {} ({})'.format(name, value)
 STATUS = lambda players: ''.join([PVALUE(p.name, p.bankroll) for p in players])
+# /proc/<pid>/stat reports CPU times in clock ticks
+CLOCK_TICKS = os.sysconf('SC_CLK_TCK') if hasattr(os, 'sysconf') else 100
+# the latency stats of every decision a player makes are also kept under this key
+LATENCY_ALL = ('All', 'all', 'all')
+# /proc/<pid>/statm reports memory in pages
+PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+OUTPUT_CHUNK_SIZE = 65536
+# what a pokerbot's own build leaves in its directory; BuildCache neither hashes nor copies it
+IGNORE_BUILD_OUTPUTS = shutil.ignore_patterns('build', '__pycache__', '*.class')
+STATUS_TOTALS = lambda bankrolls: ''.join([PVALUE(name, total) for name, total in bankrolls.items()])
+STATUS_ADJUSTED = lambda bankrolls: ''.join([PVALUE(name, '{:.1f}'.format(total)) for name, total in bankrolls.items()])
 
 # Socket encoding scheme:
 #
@@ -62,6 +96,7 @@ STATUS = lambda players: ''.join([PVALUE(p.name, p.bankroll) for p in players])
 # B**,**,**,**,** the board cards in common format
 # O**,** the opponent's hand in common format
 # D### the player's bankroll delta from the round
+# G new game on the same pokerbot process: reset per-game state
 # Q game over
 #
 # Clauses are separated by spaces
@@ -71,17 +106,40 @@ STATUS = lambda players: ''.join([PVALUE(p.name, p.bankroll) for p in players])
 # Action history is sent once, including the player's actions
 
 
-class RoundState(namedtuple('_RoundState', ['button', 'street', 'auction', 'bids', 'pips', 'stacks', 'hands', 'deck', 'previous_state'])):
+# legal action sets are shared constants so that legal_actions never allocates
+BID_ONLY = frozenset({BidAction})
+CHECK_ONLY = frozenset({CheckAction})
+CHECK_OR_RAISE = frozenset({CheckAction, RaiseAction})
+FOLD_OR_CALL = frozenset({FoldAction, CallAction})
+FOLD_CALL_OR_RAISE = frozenset({FoldAction, CallAction, RaiseAction})
+
+
+class RoundState():
     '''
-    Encodes the game tree for one round of poker.
+    Encodes the state of one round of poker.
+    Unlike the skeleton's game tree, the engine advances a single RoundState in place
+    and keeps no chain of previous states; TerminalState.previous_state holds the final one.
     '''
 
+    __slots__ = ('button', 'street', 'auction', 'bids', 'pips', 'stacks', 'hands', 'deck')
+
+    def __init__(self, button, street, auction, bids, pips, stacks, hands, deck):
+        self.button = button
+        self.street = street
+        self.auction = auction
+        self.bids = bids
+        self.pips = pips
+        self.stacks = stacks
+        self.hands = hands
+        self.deck = deck
+
     def showdown(self):
         '''
         Compares the players' hands and computes payoffs.
         '''
-        score0 = eval7.evaluate(self.deck.peek(5) + self.hands[0])
-        score1 = eval7.evaluate(self.deck.peek(5) + self.hands[1])
+        board = self.deck.peek(5)
+        score0 = eval7.evaluate(board + self.hands[0])
+        score1 = eval7.evaluate(board + self.hands[1])
         if score0 > score1:
             delta = STARTING_STACK - self.stacks[1]
         elif score0 < score1:
@@ -90,22 +148,48 @@ class RoundState(namedtuple('_RoundState', ['button', 'street', 'auction', 'bids
             delta = (self.stacks[0] - self.stacks[1]) // 2
         return TerminalState([delta, -delta], self.bids, self)
 
+    def expected_deltas(self, street):
+        '''
+        Returns the players' expected showdown payoffs once no more chips can go in,
+        averaging exactly over every runout of the board after the given street.
+        Cards left in the deck, including an unclaimed auction card, may appear on the board.
+        '''
+        board = self.deck.peek(street)
+        dead = set(board + self.hands[0] + self.hands[1])
+        remaining = [card for card in eval7.Deck().cards if card not in dead]
+        hand0, hand1 = board + self.hands[0], board + self.hands[1]
+        wins = ties = runouts = 0
+        for runout in combinations(remaining, 5 - street):
+            runout = list(runout)
+            score0 = eval7.evaluate(hand0 + runout)
+            score1 = eval7.evaluate(hand1 + runout)
+            if score0 > score1:
+                wins += 1
+            elif score0 == score1:
+                ties += 1
+            runouts += 1
+        losses = runouts - wins - ties
+        delta = (wins * (STARTING_STACK - self.stacks[1]) - losses * (STARTING_STACK - self.stacks[0]) +
+                 ties * ((self.stacks[0] - self.stacks[1]) // 2)) / runouts
+        return [delta, -delta]
+
     def legal_actions(self):
         '''
         Returns a set which corresponds to the active player's legal moves.
         '''
-        if self.auction: 
-            return {BidAction}
+        if self.auction:
+            return BID_ONLY
         active = self.button % 2
+        stacks = self.stacks
         continue_cost = self.pips[1-active] - self.pips[active]
         if continue_cost == 0:
             # we can only raise the stakes if both players can afford it
-            bets_forbidden = (self.stacks[0] == 0 or self.stacks[1] == 0)
-            return {CheckAction} if bets_forbidden else {CheckAction, RaiseAction}
+            bets_forbidden = (stacks[0] == 0 or stacks[1] == 0)
+            return CHECK_ONLY if bets_forbidden else CHECK_OR_RAISE
         # continue_cost > 0
         # similarly, re-raising is only allowed if both players can afford it
-        raises_forbidden = (continue_cost >= self.stacks[active] or self.stacks[1-active] == 0)
-        return {FoldAction, CallAction} if raises_forbidden else {FoldAction, CallAction, RaiseAction}
+        raises_forbidden = (continue_cost >= stacks[active] or stacks[1-active] == 0)
+        return FOLD_OR_CALL if raises_forbidden else FOLD_CALL_OR_RAISE
 
     def raise_bounds(self):
         '''
@@ -122,76 +206,246 @@ class RoundState(namedtuple('_RoundState', ['button', 'street', 'auction', 'bids
         '''
         Returns a tuple of the minimum and maximum legal bid amounts
         '''
-        active = self.button % 2
-        min_bid = 0
-        max_bid = self.stacks[active]
-        return (min_bid, max_bid)
+        return (0, self.stacks[self.button % 2])
 
     def proceed_street(self):
         '''
-        Resets the players' pips and advances the game tree to the next round of betting.
+        Resets the players' pips and advances to the next round of betting.
         '''
         if self.street == 5:
             return self.showdown()
+        self.button = 1
+        self.pips[0] = self.pips[1] = 0
         if self.street == 0:        # immediately after flop is dealt, we enter the auction
-            return RoundState(1, 3, True, self.bids, [0, 0], self.stacks, self.hands, self.deck, self)
-        # new_street = 3 if self.street == 0 else self.street + 1
-        # return RoundState(1, new_street, [0, 0], self.stacks, self.hands, self.deck, self)
-        return RoundState(1, self.street + 1, False, self.bids, [0, 0], self.stacks, self.hands, self.deck, self)
+            self.street = 3
+            self.auction = True
+        else:
+            self.street += 1
+        return self
 
     def proceed(self, action):
         '''
-        Advances the game tree by one action performed by the active player.
+        Advances the round by one action performed by the active player.
+        Returns this RoundState, updated in place, or a TerminalState.
         '''
         active = self.button % 2
+        pips, stacks = self.pips, self.stacks
         if isinstance(action, FoldAction):
-            delta = self.stacks[0] - STARTING_STACK if active == 0 else STARTING_STACK - self.stacks[1]
+            delta = stacks[0] - STARTING_STACK if active == 0 else STARTING_STACK - stacks[1]
             return TerminalState([delta, -delta], self.bids, self)
         if isinstance(action, CallAction):
             if self.button == 0:  # sb calls bb preflop
-                return RoundState(1, 0, self.auction, self.bids, [BIG_BLIND] * 2, [STARTING_STACK - BIG_BLIND] * 2, self.hands, self.deck, self)
+                self.button = 1
+                pips[0] = pips[1] = BIG_BLIND
+                stacks[0] = stacks[1] = STARTING_STACK - BIG_BLIND
+                return self
             # both players acted
-            new_pips = list(self.pips)
-            new_stacks = list(self.stacks)
-            contribution = new_pips[1-active] - new_pips[active]
-            new_stacks[active] -= contribution
-            new_pips[active] += contribution
-            state = RoundState(self.button + 1, self.street, self.auction, self.bids, new_pips, new_stacks, self.hands, self.deck, self)
-            return state.proceed_street()
+            contribution = pips[1-active] - pips[active]
+            stacks[active] -= contribution
+            pips[active] += contribution
+            self.button += 1
+            return self.proceed_street()
         if isinstance(action, CheckAction):
             if (self.street == 0 and self.button > 0) or self.button > 1:  # both players acted
                 return self.proceed_street()
             # let opponent act
-            return RoundState(self.button + 1, self.street, self.auction, self.bids, self.pips, self.stacks, self.hands, self.deck, self)
+            self.button += 1
+            return self
         if isinstance(action, BidAction):
-            self.bids[active] = action.amount 
-            if None not in self.bids:       # both players have submitted bids and we deal the extra card
+            bids = self.bids
+            bids[active] = action.amount
+            if None not in bids:       # both players have submitted bids and we deal the extra card
+                # the auction cards are the last two of the 48 left after dealing hole cards
+                cards = self.deck.cards
                 # case in which bids are equal, both players receive card
-                if self.bids[0] == self.bids[1]:
-                    self.hands[0].append(self.deck.peek(48)[-1])
-                    self.hands[1].append(self.deck.peek(48)[-2])
-                    new_stacks = list(self.stacks)
-                    new_stacks[0] -= self.bids[0]
-                    new_stacks[1] -= self.bids[1]
-                    state = RoundState(1, self.street, False, self.bids, self.pips, new_stacks, self.hands, self.deck, self)
+                if bids[0] == bids[1]:
+                    self.hands[0].append(cards[47])
+                    self.hands[1].append(cards[46])
+                    stacks[0] -= bids[0]
+                    stacks[1] -= bids[1]
                 else:
                 # case in which bids are not equal
-                    winner = self.bids.index(max(self.bids))
-                    self.hands[winner].append(self.deck.peek(48)[-1])
-                    new_stacks = list(self.stacks)
-                    new_stacks[winner] -= self.bids[1 - winner]
-                    state = RoundState(1, self.street, False, self.bids, self.pips, new_stacks, self.hands, self.deck, self)
-                return state
-            else:
-                return RoundState(self.button + 1, self.street, True, self.bids, self.pips, self.stacks, self.hands, self.deck, self)
+                    winner = 0 if bids[0] > bids[1] else 1
+                    self.hands[winner].append(cards[47])
+                    stacks[winner] -= bids[1 - winner]
+                self.button = 1
+                self.auction = False
+                return self
+            self.button += 1
+            return self
         if isinstance(action, RaiseAction):
-            new_pips = list(self.pips)
-            new_stacks = list(self.stacks)
-            contribution = action.amount - new_pips[active]
-            new_stacks[active] -= contribution
-            new_pips[active] += contribution
-            return RoundState(self.button + 1, self.street, self.auction, self.bids, new_pips, new_stacks, self.hands, self.deck, self)
-        
+            contribution = action.amount - pips[active]
+            stacks[active] -= contribution
+            pips[active] += contribution
+            self.button += 1
+            return self
+
+
+class OutputBuffer():
+    '''
+    Keeps the first head_size and the last tail_size bytes of a pokerbot's output,
+    counting the bytes dropped in between, so memory stays bounded however much it prints.
+    '''
+
+    def __init__(self, head_size, tail_size):
+        self.head_size = head_size
+        self.tail_size = tail_size
+        self.head = bytearray()
+        self.tail = bytearray()
+        self.dropped = 0
+        self.lock = Lock()
+
+    def put(self, data):
+        '''
+        Appends output; None (as from a process that printed nothing) is ignored.
+        '''
+        if not data:
+            return
+        with self.lock:
+            room = self.head_size - len(self.head)
+            if room > 0:
+                self.head += data[:room]
+                data = data[room:]
+            self.tail += data
+            # trim only once the tail doubles, so each byte is moved a bounded number of times
+            if len(self.tail) > 2 * self.tail_size:
+                self.trim()
+
+    def trim(self):
+        excess = len(self.tail) - self.tail_size
+        if excess > 0:
+            del self.tail[:excess]
+            self.dropped += excess
+
+    def write_to(self, log_file):
+        '''
+        Writes the kept output, marking where bytes were dropped.
+        '''
+        with self.lock:
+            self.trim()
+            log_file.write(self.head)
+            if self.dropped:
+                log_file.write('\n[{} bytes dropped]\n'.format(self.dropped).encode())
+            log_file.write(self.tail)
+
+
+class LatencyStats():
+    '''
+    A histogram of decision latencies with logarithmic buckets, so memory stays constant
+    however many decisions are recorded. Percentiles are accurate to about 2%.
+    '''
+
+    BUCKETS_PER_DOUBLING = 32
+    MIN_LATENCY = 1e-6
+
+    def __init__(self):
+        self.buckets = {}
+        self.count = 0
+        self.total = 0.
+        self.max = 0.
+        self.near_budget = 0
+
+    def record(self, latency, budget):
+        bucket = int(math.log2(max(latency, LatencyStats.MIN_LATENCY) / LatencyStats.MIN_LATENCY) *
+                     LatencyStats.BUCKETS_PER_DOUBLING)
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+        self.count += 1
+        self.total += latency
+        self.max = max(self.max, latency)
+        if latency >= budget:
+            self.near_budget += 1
+
+    def percentile(self, fraction):
+        '''
+        Returns the upper edge of the bucket holding the given fraction of the decisions.
+        '''
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= fraction * self.count:
+                upper = LatencyStats.MIN_LATENCY * 2 ** ((bucket + 1) / LatencyStats.BUCKETS_PER_DOUBLING)
+                return min(upper, self.max)
+        return self.max
+
+    def summary(self):
+        return LatencySummary(self.count, self.total / self.count, self.percentile(.5), self.percentile(.95),
+                              self.percentile(.99), self.max, self.near_budget)
+
+
+def write_latency_summaries(name, latencies):
+    '''
+    Writes the latency summaries of a GameResult to a CSV file, in milliseconds.
+    '''
+    with open(name, 'w') as latency_file:
+        latency_file.write('player,street,decision,action,count,mean_ms,p50_ms,p95_ms,p99_ms,max_ms,near_budget\n')
+        for player_name, summaries in latencies.items():
+            for key in sorted(summaries, key=lambda key: (key != LATENCY_ALL, key)):
+                summary = summaries[key]
+                latency_file.write(','.join([player_name] + list(key) + [str(summary.count)] +
+                                            ['{:.3f}'.format(1000 * value) for value in summary[1:6]] +
+                                            [str(summary.near_budget)]) + '\n')
+
+
+class BuildCache():
+    '''
+    A built copy of a pokerbot directory under BUILD_CACHE_DIR, keyed by a hash of every
+    source file in the directory and BUILD_TYPE; outputs of earlier in-place builds are left out. An unchanged pokerbot is built once and then
+    run from its copy; a lock file keeps processes from building the same copy at once.
+    '''
+
+    def __init__(self, path):
+        self.path = path
+        digest = hashlib.sha256(BUILD_TYPE.encode())
+        for root, dirs, files in os.walk(path):
+            ignored = IGNORE_BUILD_OUTPUTS(root, dirs + files)
+            dirs[:] = sorted(name for name in dirs if name not in ignored)
+            for file_name in sorted(name for name in files if name not in ignored):
+                file_path = os.path.join(root, file_name)
+                digest.update(os.path.relpath(file_path, path).encode() + b'\0')
+                with open(file_path, 'rb') as source_file:
+                    digest.update(hashlib.sha256(source_file.read()).digest())
+        name = os.path.basename(os.path.normpath(os.path.abspath(path))) + '-' + digest.hexdigest()[:16]
+        self.directory = os.path.abspath(os.path.join(BUILD_CACHE_DIR, name))
+        self.lock_file = None
+
+    def lock(self, blocking=True):
+        '''
+        Takes the lock on this copy. Without blocking, returns False if another build holds it.
+        '''
+        os.makedirs(BUILD_CACHE_DIR, exist_ok=True)
+        self.lock_file = open(self.directory + '.lock', 'w')
+        if fcntl is not None:
+            try:
+                fcntl.flock(self.lock_file, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                self.lock_file.close()
+                self.lock_file = None
+                return False
+        return True
+
+    def prepare(self):
+        '''
+        Returns True if the copy is already built; otherwise makes sure there is a copy to build in.
+        '''
+        if os.path.isfile(self.directory + '.built'):
+            return True
+        if not os.path.isdir(self.directory):
+            # copy aside and rename, so an interrupted copy is never mistaken for a whole one
+            staging = self.directory + '.copy'
+            shutil.rmtree(staging, ignore_errors=True)
+            shutil.copytree(self.path, staging, symlinks=True, ignore=IGNORE_BUILD_OUTPUTS)
+            os.rename(staging, self.directory)
+        return False
+
+    def unlock(self, built):
+        '''
+        Records a successful build and releases the lock.
+        '''
+        if built:
+            open(self.directory + '.built', 'w').close()
+        if self.lock_file is not None:
+            self.lock_file.close()
+            self.lock_file = None
 
 
 class Player():
@@ -199,20 +453,78 @@ class Player():
     Handles subprocess and socket interactions with one player's pokerbot.
     '''
 
-    def __init__(self, name, path):
+    def __init__(self, name, path, output_dir='.', quiet=False):
         self.name = name
         self.path = path
+        # where the pokerbot is built and run; a BuildCache copy when BUILD_CACHE_DIR is set
+        self.run_dir = path
+        self.output_dir = output_dir
+        self.quiet = quiet
         self.game_clock = STARTING_GAME_CLOCK
+        self.wall_clock = CPU_GAME_CLOCK_WALL_CAP
         self.bankroll = 0
+        self.timeouts = 0
+        self.illegal_actions = 0
+        self.latency = None
+        self.latency_stats = {}
+        # only the Python skeleton resets on G, so any other pokerbot's process is good for one
+        # game: the first one it is readied for by new_game, or the one it is restarted for
+        self.fresh = True
         self.commands = None
         self.bot_subprocess = None
         self.socketfile = None
-        self.bytes_queue = Queue()
+        self.output_buffer = OutputBuffer(PLAYER_LOG_SIZE_LIMIT, PLAYER_LOG_TAIL_SIZE)
 
     def build(self):
         '''
         Loads the commands file and builds the pokerbot.
         '''
+        self.load_commands()
+        if self.commands is not None and len(self.commands['build']) > 0:
+            cache = self.build_cache()
+            built = False
+            try:
+                if cache is not None and cache.lock() and cache.prepare():
+                    self.output_buffer.put(('Using the cached build in ' + cache.directory + '\n').encode())
+                    return
+                proc = subprocess.run(self.commands['build'],
+                                      stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                      cwd=self.run_dir, env=dict(os.environ, BUILD_TYPE=BUILD_TYPE),
+                                      timeout=BUILD_TIMEOUT, check=False)
+                self.output_buffer.put(proc.stdout)
+                built = proc.returncode == 0
+            except subprocess.TimeoutExpired as timeout_expired:
+                error_message = 'Timed out waiting for ' + self.name + ' to build'
+                print(error_message)
+                self.output_buffer.put(timeout_expired.stdout)
+                self.output_buffer.put(error_message.encode())
+            except (TypeError, ValueError):
+                print(self.name, 'build command misformatted')
+            except OSError:
+                print(self.name, 'build failed - check "build" in commands.json')
+            finally:
+                if cache is not None:
+                    cache.unlock(built)
+
+    def build_cache(self):
+        '''
+        Returns the BuildCache to build and run the pokerbot in, pointing run_dir at it,
+        or None if BUILD_CACHE_DIR is not set or the pokerbot's files cannot be read.
+        '''
+        if BUILD_CACHE_DIR is None:
+            return None
+        try:
+            cache = BuildCache(self.path)
+        except OSError:
+            print(self.name, 'could not be hashed for the build cache - building in place')
+            return None
+        self.run_dir = cache.directory
+        return cache
+
+    def load_commands(self):
+        '''
+        Loads the build and run commands from the pokerbot's commands.json.
+        '''
         try:
             with open(self.path + '/commands.json', 'r') as json_file:
                 commands = json.load(json_file)
@@ -226,60 +538,80 @@ class Player():
             print(self.name, 'commands.json not found - check PLAYER_PATH')
         except json.decoder.JSONDecodeError:
             print(self.name, 'commands.json misformatted')
-        if self.commands is not None and len(self.commands['build']) > 0:
-            try:
-                proc = subprocess.run(self.commands['build'],
-                                      stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
-                                      cwd=self.path, timeout=BUILD_TIMEOUT, check=False)
-                self.bytes_queue.put(proc.stdout)
-            except subprocess.TimeoutExpired as timeout_expired:
-                error_message = 'Timed out waiting for ' + self.name + ' to build'
-                print(error_message)
-                self.bytes_queue.put(timeout_expired.stdout)
-                self.bytes_queue.put(error_message.encode())
-            except (TypeError, ValueError):
-                print(self.name, 'build command misformatted')
-            except OSError:
-                print(self.name, 'build failed - check "build" in commands.json')
+
+    def transport(self):
+        '''
+        Returns the TRANSPORT to reach the pokerbot over. Only the Python skeleton
+        understands the others, so any other pokerbot connects over TCP.
+        '''
+        if TRANSPORT in ('unix', 'socketpair') and is_python_bot(self.path):
+            return TRANSPORT
+        return 'tcp'
 
     def run(self):
         '''
         Runs the pokerbot and establishes the socket connection.
+        The pokerbot is passed a TCP port, unix:<path> or fd:<inherited socket> to connect with.
         '''
         if self.commands is not None and len(self.commands['run']) > 0:
             try:
-                server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                with server_socket:
-                    server_socket.bind(('', 0))
-                    server_socket.settimeout(CONNECT_TIMEOUT)
-                    server_socket.listen()
-                    port = server_socket.getsockname()[1]
-                    proc = subprocess.Popen(self.commands['run'] + [str(port)],
-                                            stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
-                                            cwd=self.path)
-                    self.bot_subprocess = proc
-                    # function for bot listening
-                    def enqueue_output(out, queue):
-                        try:
-                            for line in out:
-                                queue.put(line)
-                        except ValueError:
-                            pass
-                    # start a separate bot listening thread which dies with the program
-                    Thread(target=enqueue_output, args=(proc.stdout, self.bytes_queue), daemon=True).start()
-                    # block until we timeout or the player connects
-                    client_socket, _ = server_socket.accept()
-                    with client_socket:
-                        client_socket.settimeout(CONNECT_TIMEOUT)
-                        sock = client_socket.makefile('rw')
-                        self.socketfile = sock
+                transport = self.transport()
+                if transport == 'socketpair':
+                    client_socket, bot_socket = socket.socketpair()
+                    with bot_socket:
+                        self.launch('fd:' + str(bot_socket.fileno()), (bot_socket.fileno(),))
+                    # the pokerbot says it is ready once loaded, as accepting a connection would
+                    client_socket.settimeout(CONNECT_TIMEOUT)
+                    if client_socket.recv(2) != b'K\n':
+                        raise socket.timeout
+                else:
+                    family = socket.AF_UNIX if transport == 'unix' else socket.AF_INET
+                    with socket.socket(family, socket.SOCK_STREAM) as server_socket, \
+                            tempfile.TemporaryDirectory() as socket_dir:
+                        if transport == 'unix':
+                            address = os.path.join(socket_dir, 'engine.sock')
+                            server_socket.bind(address)
+                            address = 'unix:' + address
+                        else:
+                            server_socket.bind(('', 0))
+                            address = str(server_socket.getsockname()[1])
+                        server_socket.settimeout(CONNECT_TIMEOUT)
+                        server_socket.listen()
+                        self.launch(address)
+                        # block until we timeout or the player connects
+                        client_socket, _ = server_socket.accept()
+                    if transport == 'tcp':
+                        client_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                with client_socket:
+                    client_socket.settimeout(CONNECT_TIMEOUT)
+                    sock = client_socket.makefile('rw')
+                    self.socketfile = sock
+                    if not self.quiet:
                         print(self.name, 'connected successfully')
             except (TypeError, ValueError):
                 print(self.name, 'run command misformatted')
-            except OSError:
-                print(self.name, 'run failed - check "run" in commands.json')
             except socket.timeout:
                 print('Timed out waiting for', self.name, 'to connect')
+            except OSError:
+                print(self.name, 'run failed - check "run" in commands.json')
+
+    def launch(self, address, pass_fds=()):
+        '''
+        Starts the pokerbot's process, telling it where to connect, and drains its output.
+        '''
+        proc = subprocess.Popen(self.commands['run'] + [address],
+                                stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                cwd=self.run_dir, pass_fds=pass_fds)
+        self.bot_subprocess = proc
+        # function for bot listening, which reads whatever output is available in large chunks
+        def enqueue_output(out, output_buffer):
+            try:
+                for chunk in iter(lambda: out.read1(OUTPUT_CHUNK_SIZE), b''):
+                    output_buffer.put(chunk)
+            except ValueError:
+                pass
+        # start a separate bot listening thread which dies with the program
+        Thread(target=enqueue_output, args=(proc.stdout, self.output_buffer), daemon=True).start()
 
     def stop(self):
         '''
@@ -296,91 +628,660 @@ class Player():
         if self.bot_subprocess is not None:
             try:
                 outs, _ = self.bot_subprocess.communicate(timeout=CONNECT_TIMEOUT)
-                self.bytes_queue.put(outs)
+                self.output_buffer.put(outs)
             except subprocess.TimeoutExpired:
                 print('Timed out waiting for', self.name, 'to quit')
                 self.bot_subprocess.kill()
                 outs, _ = self.bot_subprocess.communicate()
-                self.bytes_queue.put(outs)
-        with open(self.name + '.txt', 'wb') as log_file:
-            bytes_written = 0
-            for output in self.bytes_queue.queue:
-                try:
-                    bytes_written += log_file.write(output)
-                    if bytes_written >= PLAYER_LOG_SIZE_LIMIT:
-                        break
-                except TypeError:
-                    pass
+                self.output_buffer.put(outs)
+        with open(os.path.join(self.output_dir, self.name + '.txt'), 'wb') as log_file:
+            self.output_buffer.write_to(log_file)
+
+    def connected(self):
+        '''
+        Returns whether the pokerbot can currently be queried.
+        '''
+        return self.socketfile is not None
+
+    def cpu_time(self):
+        '''
+        Returns the CPU seconds used so far by the pokerbot's process and its children,
+        or None if the operating system does not expose them through /proc.
+        '''
+        if self.bot_subprocess is None or not os.path.isdir('/proc/self'):
+            return None
+        ticks = 0
+        pending = [str(self.bot_subprocess.pid)]
+        while pending:
+            pid = pending.pop()
+            try:
+                with open('/proc/' + pid + '/stat') as stat_file:
+                    # skip past the parenthesized command name, which may contain spaces
+                    fields = stat_file.read().rsplit(')', 1)[1].split()
+                ticks += sum(int(field) for field in fields[11:15])  # utime, stime, cutime, cstime
+                for task in os.listdir('/proc/' + pid + '/task'):
+                    with open('/proc/' + pid + '/task/' + task + '/children') as children_file:
+                        pending.extend(children_file.read().split())
+            except (OSError, IndexError, ValueError):
+                pass  # the process exited while we were reading it
+        return ticks / CLOCK_TICKS
+
+    def memory(self):
+        '''
+        Returns the resident memory of the pokerbot's process in bytes,
+        or None if the operating system does not expose it through /proc.
+        '''
+        if self.bot_subprocess is None:
+            return None
+        try:
+            with open('/proc/' + str(self.bot_subprocess.pid) + '/statm') as statm_file:
+                return int(statm_file.read().split()[1]) * PAGE_SIZE
+        except (OSError, IndexError, ValueError):
+            return None
+
+    def new_game(self):
+        '''
+        Resets the clock, the bankroll and the pokerbot's per-game state so that
+        its process can be reused for another game.
+        Returns False if the pokerbot is no longer usable and must be restarted.
+        '''
+        if not self.connected() or self.game_clock <= 0.:
+            return False
+        self.game_clock = STARTING_GAME_CLOCK
+        self.wall_clock = CPU_GAME_CLOCK_WALL_CAP
+        self.bankroll = 0
+        self.timeouts = 0
+        self.illegal_actions = 0
+        self.latency_stats = {}
+        if not is_python_bot(self.path):
+            fresh, self.fresh = self.fresh, False
+            return fresh
+        try:
+            return self.exchange(['G']) == 'K'
+        except OSError:
+            return False
+
+    def exchange(self, player_message):
+        '''
+        Sends one message to the pokerbot and returns its response clause.
+        '''
+        self.socketfile.write(' '.join(player_message) + '\n')
+        self.socketfile.flush()
+        return self.socketfile.readline().strip()
+
+    def exchange_many(self, player_messages):
+        '''
+        Sends several messages at once, then reads one response clause for each, in order.
+        '''
+        self.socketfile.write(''.join(' '.join(player_message) + '\n' for player_message in player_messages))
+        self.socketfile.flush()
+        return [self.socketfile.readline().strip() for _ in player_messages]
+
+    def charge_clock(self, start_cpu, start_time, end_time):
+        '''
+        Deducts the time spent waiting on the pokerbot from its game clock.
+        '''
+        if ENFORCE_GAME_CLOCK:
+            if start_cpu is None:
+                self.game_clock -= end_time - start_time
+            else:
+                # charge CPU time actually used, but cap the wall time a bot may block for
+                self.game_clock -= self.cpu_time() - start_cpu
+                self.wall_clock -= end_time - start_time
+                if self.wall_clock <= 0.:
+                    raise socket.timeout
+        if self.game_clock <= 0.:
+            raise socket.timeout
+
+    def decode(self, clause, round_state, legal_actions, game_log):
+        '''
+        Returns the action encoded by a response clause, or None if it is not legal.
+        Raises IndexError, KeyError or ValueError if the clause is misformatted.
+        '''
+        action = DECODE[clause[0]]
+        if action in legal_actions:
+            if clause[0] == 'R':
+                amount = int(clause[1:])
+                min_raise, max_raise = round_state.raise_bounds()
+                if min_raise <= amount <= max_raise:
+                    return action(amount)
+            elif clause[0] == 'A':
+                amount = int(clause[1:])
+                min_bid, max_bid = round_state.bid_bounds()
+                if min_bid <= amount <= max_bid:
+                    return action(amount)
+            else:
+                return action()
+        self.illegal_actions += 1
+        if clause[0] in ('R', 'A'):
+            game_log.append(self.name + ' attempted illegal ' + action.__name__ + ' with amount ' + str(int(clause[1:])))
+        else:
+            game_log.append(self.name + ' attempted illegal ' + action.__name__)
+        return None
+
+    def misformatted(self, clause, error, game_log):
+        # TODO: responses are being misformatted when running game
+        self.illegal_actions += 1
+        game_log.append(self.name + ' response misformatted: ' + str(clause))
+        game_log.append(type(error).__name__)
+
+    def drop(self, error_message, game_logs):
+        '''
+        Records that the pokerbot timed out or disconnected and stops querying it.
+        '''
+        for game_log in game_logs:
+            game_log.append(error_message)
+        print(error_message)
+        self.game_clock = 0.
+
+    def record_latency(self, round_state, action, latency):
+        '''
+        Adds a decision's latency to the stats for its street, kind of decision and action.
+        '''
+        if isinstance(round_state, RoundState):
+            street = 'Preflop' if round_state.street == 0 else STREET_NAMES[round_state.street - 3]
+            decision = 'auction' if round_state.auction else 'betting'
+        else:
+            street, decision = 'End', 'ack'
+        budget = NEAR_BUDGET_FRACTION * STARTING_GAME_CLOCK / NUM_ROUNDS
+        for key in ((street, decision, type(action).__name__[:-len('Action')]), LATENCY_ALL):
+            stats = self.latency_stats.get(key)
+            if stats is None:
+                stats = self.latency_stats[key] = LatencyStats()
+            stats.record(latency, budget)
+
+    def latency_summaries(self):
+        return {key: stats.summary() for key, stats in self.latency_stats.items()}
+
+    @staticmethod
+    def default_action(legal_actions):
+        '''
+        The action taken for a pokerbot that fails to submit a legal one.
+        '''
+        # set a base bid action of 0 if pokerbot fails to submit legal bid action
+        if BidAction in legal_actions:
+            return BidAction(0)
+        return CheckAction() if CheckAction in legal_actions else FoldAction()
 
     def query(self, round_state, player_message, game_log):
         '''
         Requests one action from the pokerbot over the socket connection.
         At the end of the round, we request a CheckAction from the pokerbot.
         '''
-        legal_actions = round_state.legal_actions() if isinstance(round_state, RoundState) else {CheckAction}
-        if self.socketfile is not None and self.game_clock > 0.:
+        legal_actions = round_state.legal_actions() if isinstance(round_state, RoundState) else CHECK_ONLY
+        self.latency = None
+        action = None
+        if self.connected() and self.game_clock > 0.:
             clause = ''
             try:
                 player_message[0] = 'T{:.3f}'.format(self.game_clock)
-                message = ' '.join(player_message) + '\n'
-                del player_message[1:]  # do not send redundant action history
+                start_cpu = self.cpu_time() if CPU_GAME_CLOCK else None
                 start_time = time.perf_counter()
-                self.socketfile.write(message)
-                self.socketfile.flush()
-                clause = self.socketfile.readline().strip()
+                clause = self.exchange(player_message)
                 end_time = time.perf_counter()
-                if ENFORCE_GAME_CLOCK:
-                    self.game_clock -= end_time - start_time
-                if self.game_clock <= 0.:
-                    raise socket.timeout
-                action = DECODE[clause[0]]
-                if action in legal_actions:
-                    if clause[0] == 'R':
-                        amount = int(clause[1:])
-                        min_raise, max_raise = round_state.raise_bounds()
-                        if min_raise <= amount <= max_raise:
-                            return action(amount)
-                    elif clause[0] == 'A':
-                        amount = int(clause[1:])
-                        min_bid, max_bid = round_state.bid_bounds()
-                        if min_bid <= amount <= max_bid:
-                            return action(amount)
-                    else:
-                        return action()
-                if clause[0] in ('R', 'A'):
-                    game_log.append(self.name + ' attempted illegal ' + action.__name__ + ' with amount ' + str(int(clause[1:])))
-                else:
-                    game_log.append(self.name + ' attempted illegal ' + action.__name__)
+                self.latency = end_time - start_time
+                del player_message[1:]  # do not send redundant action history
+                self.charge_clock(start_cpu, start_time, end_time)
+                action = self.decode(clause, round_state, legal_actions, game_log)
+            except socket.timeout:
+                self.timeouts += 1
+                self.drop(self.name + ' ran out of time', [game_log])
+            except OSError:
+                self.drop(self.name + ' disconnected', [game_log])
+            except (IndexError, KeyError, ValueError) as error:
+                self.misformatted(clause, error, game_log)
+        else:
+            del player_message[1:]  # a dropped pokerbot is sent nothing more
+        if action is None:
+            action = self.default_action(legal_actions)
+        if self.latency is not None:
+            self.record_latency(round_state, action, self.latency)
+        return action
 
+    def query_tables(self, requests):
+        '''
+        Requests one action for each (table, round_state, player_message, game_log) of a
+        multi-table match. Every message is tagged with its table id, and all of them are
+        sent before any response is read, so the pokerbot works through them back to back.
+        '''
+        legal_actions = [round_state.legal_actions() if isinstance(round_state, RoundState) else CHECK_ONLY
+                         for _, round_state, _, _ in requests]
+        actions = [None] * len(requests)
+        self.latency = None
+        if self.connected() and self.game_clock > 0.:
+            try:
+                messages = []
+                for table, _, player_message, _ in requests:
+                    player_message[0] = 'T{:.3f}'.format(self.game_clock)
+                    messages.append(['I' + str(table)] + player_message)
+                    del player_message[1:]  # do not send redundant action history
+                start_cpu = self.cpu_time() if CPU_GAME_CLOCK else None
+                start_time = time.perf_counter()
+                clauses = self.exchange_many(messages)
+                end_time = time.perf_counter()
+                self.latency = end_time - start_time
+                self.charge_clock(start_cpu, start_time, end_time)
+                for i, (clause, (_, round_state, _, game_log)) in enumerate(zip(clauses, requests)):
+                    try:
+                        actions[i] = self.decode(clause, round_state, legal_actions[i], game_log)
+                    except (IndexError, KeyError, ValueError) as error:
+                        self.misformatted(clause, error, game_log)
             except socket.timeout:
-                error_message = self.name + ' ran out of time'
-                game_log.append(error_message)
-                print(error_message)
-                self.game_clock = 0.
+                self.timeouts += 1
+                self.drop(self.name + ' ran out of time', [game_log for _, _, _, game_log in requests])
             except OSError:
-                error_message = self.name + ' disconnected'
-                game_log.append(error_message)
-                print(error_message)
-                self.game_clock = 0.
-            # except (IndexError, KeyError, ValueError):
-            #     # TODO: responses are being misformatted when running game
-            #     game_log.append(self.name + ' response misformatted: ' + str(clause))
-            except IndexError:
-                # TODO: responses are being misformatted when running game
-                game_log.append(self.name + ' response misformatted: ' + str(clause))
-                game_log.append('IndexError')
-            except KeyError:
-                # TODO: responses are being misformatted when running game
-                game_log.append(self.name + ' response misformatted: ' + str(clause))
-                game_log.append('KeyError')
-            except ValueError:
-                # TODO: responses are being misformatted when running game
-                game_log.append(self.name + ' response misformatted: ' + str(clause))
-                game_log.append('ValueError')
-        # set a base bid action of 0 if pokerbot fails to submit legal bid action
-        if BidAction in legal_actions: 
-            return BidAction(0)
-        return CheckAction() if CheckAction in legal_actions else FoldAction()
+                self.drop(self.name + ' disconnected', [game_log for _, _, _, game_log in requests])
+        else:
+            for _, _, player_message, _ in requests:
+                del player_message[1:]  # a dropped pokerbot is sent nothing more
+        actions = [self.default_action(legal) if action is None else action
+                   for action, legal in zip(actions, legal_actions)]
+        if self.latency is not None:
+            # the decisions were made back to back, so each is charged an equal share of the batch
+            for (_, round_state, _, _), action in zip(requests, actions):
+                self.record_latency(round_state, action, self.latency / len(requests))
+        return actions
+
+
+def load_pokerbot(path):
+    '''
+    Imports player.py from a Python pokerbot directory and instantiates its Player.
+    The bot's own modules (player, skeleton, ...) are removed from sys.modules afterwards,
+    so that two bots with different skeleton copies can share one interpreter.
+    Returns the pokerbot and a dict of its skeleton modules.
+    '''
+    bot_dir = os.path.abspath(path)
+    shadowed = {name: sys.modules.pop(name) for name in list(sys.modules)
+                if name in ('player', 'skeleton') or name.startswith('skeleton.')}
+    existing = set(sys.modules)
+    cwd = os.getcwd()
+    sys.path.insert(0, bot_dir)
+    os.chdir(bot_dir)  # bots open files such as hand_strengths.pkl relative to their directory
+    try:
+        spec = importlib.util.spec_from_file_location('player', os.path.join(bot_dir, 'player.py'))
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        pokerbot = module.Player()
+        skeleton = {'actions': sys.modules['skeleton.actions'], 'states': sys.modules['skeleton.states']}
+    finally:
+        os.chdir(cwd)
+        sys.path.remove(bot_dir)
+        for name in set(sys.modules) - existing:
+            module_file = getattr(sys.modules[name], '__file__', None) or ''
+            if os.path.abspath(module_file).startswith(bot_dir + os.sep):
+                del sys.modules[name]
+        sys.modules.update(shadowed)
+    return pokerbot, skeleton
+
+
+class LocalRunner():
+    '''
+    Mirrors skeleton/runner.py for a pokerbot loaded into the engine process.
+    Processes one engine message at a time instead of reading from a socket.
+    '''
+
+    ENCODE = {'FoldAction': 'F', 'CallAction': 'C', 'CheckAction': 'K', 'RaiseAction': 'R', 'BidAction': 'A'}
+
+    def __init__(self, pokerbot, skeleton, bot_dir):
+        self.pokerbot = pokerbot
+        self.actions = skeleton['actions']
+        self.states = skeleton['states']
+        self.bot_dir = bot_dir
+        self.game_state = self.states.GameState(0, 0., 1)
+        self.round_state = None
+        self.active = 0
+        self.round_flag = True
+        # multi-table matches keep one pokerbot and game tree per table
+        self.tables = {}
+        self.table = 0
+
+    def new_pokerbot(self):
+        '''
+        Constructs another instance of the pokerbot for a new table or game.
+        '''
+        cwd = os.getcwd()
+        os.chdir(self.bot_dir)
+        try:
+            return type(self.pokerbot)()
+        finally:
+            os.chdir(cwd)
+
+    def send(self, action):
+        '''
+        Encodes an action the same way the skeleton runner does.
+        '''
+        code = LocalRunner.ENCODE.get(type(action).__name__, '')
+        if code in ('R', 'A'):
+            code += str(action.amount)
+        return code
+
+    def step(self, packet):
+        '''
+        Reconstructs the game tree from one message and returns the pokerbot's response clause.
+        '''
+        actions, states = self.actions, self.states
+        GameState, RoundState, TerminalState = states.GameState, states.RoundState, states.TerminalState
+        game_state, round_state, active = self.game_state, self.round_state, self.active
+        for clause in packet:
+            if clause[0] == 'I':
+                self.tables[self.table] = (self.pokerbot, game_state, round_state, active, self.round_flag)
+                self.table = int(clause[1:])
+                if self.table not in self.tables:
+                    self.tables[self.table] = (self.new_pokerbot(), GameState(0, 0., 1), None, 0, True)
+                self.pokerbot, game_state, round_state, active, self.round_flag = self.tables[self.table]
+            elif clause[0] == 'T':
+                game_state = GameState(game_state.bankroll, float(clause[1:]), game_state.round_num)
+            elif clause[0] == 'P':
+                active = int(clause[1:])
+            elif clause[0] == 'H':
+                hands = [[], []]
+                hands[active] = clause[1:].split(',')
+                pips = [states.SMALL_BLIND, states.BIG_BLIND]
+                stacks = [states.STARTING_STACK - states.SMALL_BLIND, states.STARTING_STACK - states.BIG_BLIND]
+                round_state = RoundState(0, 0, False, [None, None], pips, stacks, hands, [], None)
+                if self.round_flag:
+                    self.pokerbot.handle_new_round(game_state, round_state, active)
+                    self.round_flag = False
+            elif clause[0] == 'F':
+                round_state = round_state.proceed(actions.FoldAction())
+            elif clause[0] == 'C':
+                round_state = round_state.proceed(actions.CallAction())
+            elif clause[0] == 'K':
+                round_state = round_state.proceed(actions.CheckAction())
+            elif clause[0] == 'R':
+                round_state = round_state.proceed(actions.RaiseAction(int(clause[1:])))
+            elif clause[0] == 'A':
+                round_state = round_state.proceed(actions.BidAction(int(clause[1:])))
+            elif clause[0] == 'N':
+                hands = [[], []]
+                stacks, bids, active_hands = clause[1:].split('_')
+                hands[active] = active_hands.split(',')
+                round_state = RoundState(round_state.button, round_state.street, round_state.auction,
+                                         [int(x) for x in bids.split(',')], round_state.pips,
+                                         [int(x) for x in stacks.split(',')], hands, round_state.deck, round_state)
+            elif clause[0] == 'B':
+                round_state = RoundState(round_state.button, round_state.street, round_state.auction, round_state.bids,
+                                         round_state.pips, round_state.stacks, round_state.hands, clause[1:].split(','),
+                                         round_state.previous_state)
+            elif clause[0] == 'O':
+                # backtrack
+                round_state = round_state.previous_state
+                revised_hands = list(round_state.hands)
+                revised_hands[1-active] = clause[1:].split(',')
+                # rebuild history
+                round_state = RoundState(round_state.button, round_state.street, round_state.auction, round_state.bids,
+                                         round_state.pips, round_state.stacks, revised_hands, round_state.deck,
+                                         round_state.previous_state)
+                round_state = TerminalState([0, 0], round_state.bids, round_state)
+            elif clause[0] == 'D':
+                delta = int(clause[1:])
+                deltas = [-delta, -delta]
+                deltas[active] = delta
+                round_state = TerminalState(deltas, round_state.bids, round_state.previous_state)
+                game_state = GameState(game_state.bankroll + delta, game_state.game_clock, game_state.round_num)
+                self.pokerbot.handle_round_over(game_state, round_state, active)
+                game_state = GameState(game_state.bankroll, game_state.game_clock, game_state.round_num + 1)
+                self.round_flag = True
+            elif clause[0] == 'G':
+                # a fresh pokerbot starts the game, so nothing it learned in the last one carries over
+                self.pokerbot = self.new_pokerbot()
+                game_state = GameState(0, 0., 1)
+                round_state = None
+                self.round_flag = True
+                self.tables = {}
+        self.game_state, self.round_state, self.active = game_state, round_state, active
+        if self.round_flag:  # ack the engine
+            return 'K'
+        return self.send(self.pokerbot.get_action(game_state, round_state, active))
+
+
+class OutputSink():
+    '''
+    File-like object which forwards an in-process pokerbot's prints to its output buffer.
+    '''
+
+    def __init__(self, output_buffer):
+        self.output_buffer = output_buffer
+
+    def write(self, text):
+        self.output_buffer.put(text.encode())
+        return len(text)
+
+    def flush(self):
+        pass
+
+
+class LocalPlayer(Player):
+    '''
+    Runs a Python pokerbot inside the engine process instead of over a subprocess and socket.
+    '''
+
+    def __init__(self, name, path, output_dir='.', quiet=False):
+        super().__init__(name, path, output_dir, quiet)
+        self.runner = None
+        self.stdout = OutputSink(self.output_buffer)
+
+    def build(self):
+        '''
+        Imports the pokerbot's player.py and constructs its Player.
+        '''
+        try:
+            with contextlib.redirect_stdout(self.stdout):
+                pokerbot, skeleton = load_pokerbot(self.path)
+            self.runner = LocalRunner(pokerbot, skeleton, os.path.abspath(self.path))
+        except Exception:
+            print(self.name, 'failed to load in-process - check player.py')
+            self.output_buffer.put(traceback.format_exc().encode())
+
+    def run(self):
+        '''
+        Nothing to launch; the pokerbot was constructed by build.
+        '''
+        if self.runner is not None and not self.quiet:
+            print(self.name, 'loaded in-process')
+
+    def connected(self):
+        return self.runner is not None
+
+    def cpu_time(self):
+        '''
+        Returns the engine thread's CPU seconds, which only the pokerbot uses during exchange.
+        '''
+        return time.thread_time()
+
+    def memory(self):
+        '''
+        An in-process pokerbot shares the engine's memory, so none is attributed to it.
+        '''
+        return None
+
+    def exchange(self, player_message):
+        '''
+        Hands one message to the pokerbot and returns its response clause.
+        Exceptions raised by the pokerbot are treated like a dropped connection.
+        '''
+        return self.exchange_many([player_message])[0]
+
+    def exchange_many(self, player_messages):
+        '''
+        Hands several messages to the pokerbot in order and returns its response clauses.
+        Exceptions raised by the pokerbot are treated like a dropped connection.
+        '''
+        try:
+            with contextlib.redirect_stdout(self.stdout):
+                return [self.runner.step(player_message) for player_message in player_messages]
+        except Exception as exception:
+            self.output_buffer.put(traceback.format_exc().encode())
+            self.runner = None
+            raise OSError from exception
+
+
+def is_python_bot(path):
+    '''
+    Returns True if the pokerbot at path is run by the Python skeleton. Only its runner
+    understands the engine's protocol extensions; the C++ and Java runners do not.
+    '''
+    return os.path.isfile(os.path.join(path, 'player.py'))
+
+
+def make_player(name, path, output_dir='.', quiet=False):
+    '''
+    Creates the engine-side handle for a pokerbot, loading Python bots in-process when enabled.
+    '''
+    if IN_PROCESS_PLAYERS and is_python_bot(path):
+        return LocalPlayer(name, path, output_dir, quiet)
+    return Player(name, path, output_dir, quiet)
+
+
+def start_player(name, path, output_dir='.', quiet=False):
+    '''
+    Creates, builds and launches one pokerbot.
+    With quiet, only errors are printed.
+    '''
+    player = make_player(name, path, output_dir, quiet)
+    player.build()
+    player.run()
+    return player
+
+
+def start_players(output_dir='.', quiet=False):
+    '''
+    Creates, builds and launches both pokerbots named in config.py.
+    Subprocess pokerbots are built and connected concurrently, so setup takes
+    as long as the slower of the two rather than both together.
+    The returned players can be passed to Game.run for any number of games
+    and must be stopped by the caller afterwards.
+    '''
+    players = [make_player(PLAYER_1_NAME, PLAYER_1_PATH, output_dir, quiet),
+               make_player(PLAYER_2_NAME, PLAYER_2_PATH, output_dir, quiet)]
+    # loading an in-process pokerbot changes the working directory, so nothing else may start meanwhile
+    for player in players:
+        if isinstance(player, LocalPlayer):
+            player.build()
+            player.run()
+
+    def launch(player):
+        player.build()
+        player.run()
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        list(executor.map(launch, [player for player in players if not isinstance(player, LocalPlayer)]))
+    return players
+
+
+def prepare_players(players, output_dir='.', quiet=False):
+    '''
+    Returns a fresh list of started players, or readies reused ones for a new game,
+    restarting (in place) any that can no longer be used.
+    '''
+    if players is None:
+        return start_players(output_dir, quiet)
+    for i, player in enumerate(players):
+        if not player.new_game():
+            print(player.name, 'could not be reused - restarting')
+            player.stop()
+            players[i] = start_player(player.name, player.path, player.output_dir, player.quiet)
+            players[i].fresh = False
+    return list(players)
+
+
+class GameLog():
+    '''
+    Streams game log lines to disk through a buffered, optionally compressed file,
+    so memory stays flat however many rounds are played.
+    '''
+
+    def __init__(self, name, first_line, compression=None):
+        if compression == 'zstd':
+            try:
+                import zstandard
+            except ImportError:
+                print('zstandard is not installed - writing an uncompressed game log')
+                compression = None
+        self.compression = compression
+        self.first_line = first_line
+        self.name = name + {'gzip': '.gz', 'zstd': '.zst'}.get(compression, '')
+        self.file = self.open()
+        self.file.write(first_line)
+
+    def open(self):
+        if self.compression == 'gzip':
+            return gzip.open(self.name, 'wt')
+        if self.compression == 'zstd':
+            import zstandard
+            writer = zstandard.ZstdCompressor().stream_writer(open(self.name, 'wb'))
+            return io.TextIOWrapper(writer, encoding='utf-8')
+        return open(self.name, 'w')
+
+    def rollover(self, keep_files, note):
+        '''
+        Closes the log and continues in a new file under the same name, as logging's
+        RotatingFileHandler does: earlier files are renamed name.1, name.2, ...
+        and only the newest keep_files files are kept.
+        '''
+        self.file.close()
+        for i in range(keep_files - 1, 0, -1):
+            older = self.name if i == 1 else self.name + '.' + str(i - 1)
+            if os.path.exists(older):
+                os.replace(older, self.name + '.' + str(i))
+        if keep_files <= 1:
+            os.remove(self.name)
+        self.file = self.open()
+        self.file.write(self.first_line + ' ' + note)
+
+    def append(self, line):
+        '''
+        Adds one line to the log. Lines are newline-separated, with no trailing newline.
+        '''
+        self.file.write('\n' + line)
+
+    def flush(self):
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class Observer():
+    '''
+    Base class for in-process observers of a game, registered with Game.add_observer.
+    Override any of the methods below; the engine calls them as the game unfolds.
+    The RoundState passed in is advanced in place afterwards, so copy anything you keep.
+    '''
+
+    def on_round_start(self, round_num, players, round_state):
+        '''
+        Called when a round has been dealt, before any action.
+        players are indexed by seat; players[0] posts the small blind.
+        '''
+        pass
+
+    def on_action(self, player, action, round_state, latency):
+        '''
+        Called for every action, with the RoundState it was taken in.
+        latency is the pokerbot's response time in seconds, or None for actions
+        it was not asked for (forced checks, or after it timed out or disconnected).
+        In a multi-table match it is the time taken for the player's whole batch.
+        '''
+        pass
+
+    def on_auction(self, players, round_state):
+        '''
+        Called once both bids are in and the auction cards have been dealt.
+        '''
+        pass
+
+    def on_showdown(self, players, terminal_state):
+        '''
+        Called when a round ends with both hands shown.
+        terminal_state.previous_state holds the final RoundState.
+        '''
+        pass
+
+    def on_match_end(self, result):
+        '''
+        Called with the GameResult once the game is over.
+        '''
+        pass
 
 
 class Game():
@@ -388,9 +1289,36 @@ class Game():
     Manages logging and the high-level game procedure.
     '''
 
-    def __init__(self):
-        self.log = ['6.9630 MIT Pokerbots - ' + PLAYER_1_NAME + ' vs ' + PLAYER_2_NAME]
+    def __init__(self, output_dir='.', seed=None, swap_seats=False, table=None, quiet=False):
+        self.output_dir = output_dir
+        self.seed = seed
+        self.swap_seats = swap_seats
+        self.quiet = quiet
+        # a seeded generator fixes the deck of every round, independent of the pokerbots' randomness
+        self.rng = random.Random(seed)
+        self.log_suffix = ('' if table is None else '_table' + str(table)) + ('_swapped' if swap_seats else '')
+        name = os.path.join(output_dir, GAME_LOG_FILENAME + self.log_suffix + '.txt')
+        self.log = GameLog(name, '6.9630 MIT Pokerbots - ' + PLAYER_1_NAME + ' vs ' + PLAYER_2_NAME,
+                           GAME_LOG_COMPRESSION)
+        if seed is not None:
+            self.log.append('Deck seed {}{}'.format(seed, ', seats swapped' if swap_seats else ''))
         self.player_messages = [[], []]
+        self.pending_messages = {}
+        self.bankrolls = None
+        self.deltas = {}
+        self.adjusted_bankrolls = {}
+        self.result = None
+        self.observers = []
+        self.start_time = time.perf_counter()
+        self.checkpoint_file = None
+        self.executor = None
+        self.concurrent_auction = False
+
+    def add_observer(self, observer):
+        '''
+        Registers an Observer. Without observers, no hooks are dispatched at all.
+        '''
+        self.observers.append(observer)
 
     def log_round_state(self, players, round_state):
         '''
@@ -412,8 +1340,11 @@ class Game():
             self.log.append('{} posts the blind of {}'.format(players[1].name, BIG_BLIND))
             self.log.append('{} dealt {}'.format(players[0].name, PCARDS(round_state.hands[0])))
             self.log.append('{} dealt {}'.format(players[1].name, PCARDS(round_state.hands[1])))
-            self.player_messages[0] = ['T0.', 'P0', 'H' + CCARDS(round_state.hands[0])]
-            self.player_messages[1] = ['T0.', 'P1', 'H' + CCARDS(round_state.hands[1])]
+            # with PIGGYBACK_ROUND_OVER, the last round's O and D clauses are still waiting to be sent
+            self.player_messages[0] = (['T0.'] + self.pending_messages.pop(players[0].name, []) +
+                                       ['P0', 'H' + CCARDS(round_state.hands[0])])
+            self.player_messages[1] = (['T0.'] + self.pending_messages.pop(players[1].name, []) +
+                                       ['P1', 'H' + CCARDS(round_state.hands[1])])
         elif round_state.street > 0 and round_state.button == 1:
             board = round_state.deck.peek(round_state.street)
             self.log.append(STREET_NAMES[round_state.street - 3] + ' ' + PCARDS(board) +
@@ -466,62 +1397,411 @@ class Game():
         self.player_messages[0].append('D' + str(round_state.deltas[0]))
         self.player_messages[1].append('D' + str(round_state.deltas[1]))
 
-    def run_round(self, players):
+    def new_deck(self, round_num):
         '''
-        Runs one round of poker (1 hand).
+        Returns the shuffled deck for a round.
         '''
         deck = eval7.Deck()
-        deck.shuffle()
+        self.rng.shuffle(deck.cards)
+        return deck
+
+    def play_round(self, players, round_num):
+        '''
+        Plays one round of poker (1 hand) as a generator. It yields the list of
+        (seat, round_state) decisions it needs next and is sent back their actions.
+        '''
+        deck = self.new_deck(round_num)
         hands = [deck.deal(2), deck.deal(2)]
         auction = False
         bids = [None, None]
         pips = [SMALL_BLIND, BIG_BLIND]
         stacks = [STARTING_STACK - SMALL_BLIND, STARTING_STACK - BIG_BLIND]
-        round_state = RoundState(0, 0, auction, bids, pips, stacks, hands, deck, None)
+        round_state = RoundState(0, 0, auction, bids, pips, stacks, hands, deck)
+        expected_deltas = None
+        if self.observers:
+            for observer in self.observers:
+                observer.on_round_start(round_num, players, round_state)
         while not isinstance(round_state, TerminalState):
             self.log_round_state(players, round_state)
+            if self.concurrent_auction and round_state.auction and round_state.bids == [None, None]:
+                # bids are sealed, so both players bid at once and neither sees the other's bid
+                second_bidder_state = RoundState(round_state.button + 1, round_state.street, True, round_state.bids,
+                                                 round_state.pips, round_state.stacks, round_state.hands, round_state.deck)
+                actions = yield [(0, second_bidder_state), (1, round_state)]
+                for active in (1, 0):  # proceed in the order the sequential engine would
+                    self.log_action(players[active].name, actions[active], False)
+                    if self.observers:
+                        for observer in self.observers:
+                            observer.on_action(players[active], actions[active], round_state, players[active].latency)
+                    round_state = round_state.proceed(actions[active])
+                if expected_deltas is None:
+                    expected_deltas = self.score_all_in(players, round_state, 3)
+                if self.observers:
+                    for observer in self.observers:
+                        observer.on_auction(players, round_state)
+                continue
             active = round_state.button % 2
             player = players[active]
-            action = player.query(round_state, self.player_messages[active], self.log)
+            if round_state.legal_actions() is CHECK_ONLY:
+                # someone is all-in, so there is nothing to decide; the check still goes into the history
+                action = CheckAction()
+                latency = None
+            else:
+                action, = yield [(active, round_state)]
+                latency = player.latency
             bet_override = (round_state.pips == [0, 0])
             self.log_action(player.name, action, bet_override)
+            if self.observers:
+                for observer in self.observers:
+                    observer.on_action(player, action, round_state, latency)
+            street = round_state.street  # proceed updates the state in place, dealing the next street
             round_state = round_state.proceed(action)
+            if expected_deltas is None:
+                expected_deltas = self.score_all_in(players, round_state, street)
+            if self.observers and isinstance(action, BidAction) and not round_state.auction:
+                for observer in self.observers:
+                    observer.on_auction(players, round_state)
         self.log_terminal_state(players, round_state)
-        for player, player_message, delta in zip(players, self.player_messages, round_state.deltas):
-            player.query(round_state, player_message, self.log)
+        if self.observers and FoldAction not in round_state.previous_state.legal_actions():
+            for observer in self.observers:
+                observer.on_showdown(players, round_state)
+        if PIGGYBACK_ROUND_OVER and round_num < NUM_ROUNDS:
+            # the next round's first message to each player carries the round's end instead of an ack;
+            # players change seats between rounds, so their clauses are kept by name
+            self.pending_messages = {player.name: player_message[1:]
+                                     for player, player_message in zip(players, self.player_messages)}
+        else:
+            yield [(0, round_state), (1, round_state)]
+        if expected_deltas is None:
+            expected_deltas = round_state.deltas
+        for player, delta, expected_delta in zip(players, round_state.deltas, expected_deltas):
             player.bankroll += delta
+            if not SOAK_MODE:  # the only per-round record the engine keeps
+                self.deltas.setdefault(player.name, []).append(delta)
+            self.adjusted_bankrolls[player.name] = self.adjusted_bankrolls.get(player.name, 0) + expected_delta
 
-    def run(self):
+    def score_all_in(self, players, round_state, street):
+        '''
+        Returns the expected deltas if the action just taken on street closed the betting
+        with a player all-in, so that only the runout is left to chance, and logs them.
+        Returns None otherwise. A preflop all-in is scored once the auction on the flop is over.
+        '''
+        if (isinstance(round_state, TerminalState) or round_state.auction or 0 not in round_state.stacks or
+                round_state.pips[0] != round_state.pips[1]):
+            return None
+        expected_deltas = round_state.expected_deltas(street)
+        self.log.append('All-in on the {}, {} expected {:.1f}, {} expected {:.1f}'.format(
+            STREET_NAMES[street - 3], players[0].name, expected_deltas[0], players[1].name, expected_deltas[1]))
+        return expected_deltas
+
+    def run_round(self, players, round_num):
+        '''
+        Runs one round of poker (1 hand).
+        '''
+        round_generator = self.play_round(players, round_num)
+        requests = next(round_generator)
+        while True:
+            if len(requests) == 1:
+                seat, round_state = requests[0]
+                actions = [players[seat].query(round_state, self.player_messages[seat], self.log)]
+            else:
+                actions = self.query_both(players, [round_state for _, round_state in requests])
+            try:
+                requests = round_generator.send(actions)
+            except StopIteration:
+                return
+
+    def query_both(self, players, round_states):
+        '''
+        Requests an action from each player for decisions that do not depend on each other.
+        With CONCURRENT_QUERIES, both requests are outstanding at the same time.
+        '''
+        if self.executor is None:
+            return [player.query(round_state, player_message, self.log)
+                    for player, round_state, player_message in zip(players, round_states, self.player_messages)]
+        future = self.executor.submit(players[1].query, round_states[1], self.player_messages[1], self.log)
+        action = players[0].query(round_states[0], self.player_messages[0], self.log)
+        return [action, future.result()]
+
+    def run(self, players=None):
+        '''
+        Runs one game of poker and returns its GameResult.
+        If players from start_players are given, their processes are reused
+        and left running; otherwise fresh pokerbots are launched and stopped.
+        With swap_seats, PLAYER_2 is dealt the cards PLAYER_1 would have received.
+        '''
+        if not self.quiet:
+            self.print_banner()
+        persistent = players is not None
+        players = prepare_players(players, self.output_dir, self.quiet)
+        if self.swap_seats:
+            players = players[::-1]
+        # in-process players share the interpreter, so only subprocess players are queried concurrently
+        if CONCURRENT_QUERIES and not any(isinstance(player, LocalPlayer) for player in players):
+            self.executor = ThreadPoolExecutor(max_workers=1)
+            self.concurrent_auction = True
+        for round_num in range(1, NUM_ROUNDS + 1):
+            self.log.append('')
+            self.log.append('Round #' + str(round_num) + STATUS(players))
+            self.run_round(players, round_num)
+            players = players[::-1]
+            if round_num % GAME_LOG_FLUSH_ROUNDS == 0:
+                self.log.flush()
+            if SOAK_MODE:
+                self.soak(players, round_num)
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+        if not persistent:
+            for player in players:
+                player.stop()
+        return self.finish(players)
+
+    def soak(self, players, round_num):
         '''
-        Runs one game of poker.
+        Writes a checkpoint every SOAK_CHECKPOINT_ROUNDS rounds and rolls the game log
+        over every SOAK_LOG_ROUNDS rounds.
         '''
+        if round_num % SOAK_CHECKPOINT_ROUNDS == 0:
+            if self.checkpoint_file is None:
+                self.checkpoint_file = open(os.path.join(self.output_dir, GAME_LOG_FILENAME + '_checkpoints.csv'), 'w')
+                self.checkpoint_file.write('round,seconds,player,bankroll,game_clock,clock_used,memory_mb\n')
+                self.checkpoint_clocks = {player.name: STARTING_GAME_CLOCK for player in players}
+                self.checkpoint_time = self.start_time
+            now = time.perf_counter()
+            status = ''
+            for player in sorted(players, key=lambda player: player.name):
+                memory = player.memory()
+                memory = '' if memory is None else '{:.1f}'.format(memory / 2 ** 20)
+                clock_used = self.checkpoint_clocks[player.name] - player.game_clock
+                self.checkpoint_clocks[player.name] = player.game_clock
+                self.checkpoint_file.write('{},{:.1f},{},{},{:.3f},{:.3f},{}\n'.format(
+                    round_num, now - self.start_time, player.name, player.bankroll, player.game_clock, clock_used, memory))
+                status += PVALUE(player.name, player.bankroll) + ' {:.3f}s used'.format(clock_used)
+                if memory:
+                    status += ' ' + memory + 'MB'
+            self.checkpoint_file.flush()
+            if not self.quiet:
+                print('Checkpoint at round {} after {:.1f}s{}'.format(round_num, now - self.checkpoint_time, status))
+            self.checkpoint_time = now
+        if round_num % SOAK_LOG_ROUNDS == 0 and round_num < NUM_ROUNDS:
+            self.log.rollover(SOAK_LOG_FILES, '(continued from round {})'.format(round_num + 1))
+
+    @staticmethod
+    def print_banner():
         print('   __  _____________  ___       __           __        __    ')
         print('  /  |/  /  _/_  __/ / _ \\___  / /_____ ____/ /  ___  / /____')
         print(' / /|_/ // /  / /   / ___/ _ \\/  \'_/ -_) __/ _ \\/ _ \\/ __(_-<')
         print('/_/  /_/___/ /_/   /_/   \\___/_/\\_\\\\__/_/ /_.__/\\___/\\__/___/')
         print()
         print('Starting the Pokerbots engine...')
-        players = [
-            Player(PLAYER_1_NAME, PLAYER_1_PATH),
-            Player(PLAYER_2_NAME, PLAYER_2_PATH)
-        ]
-        for player in players:
-            player.build()
-            player.run()
-        for round_num in range(1, NUM_ROUNDS + 1):
-            self.log.append('')
-            self.log.append('Round #' + str(round_num) + STATUS(players))
-            self.run_round(players)
-            players = players[::-1]
+
+    def finish(self, players):
+        '''
+        Logs the final bankrolls, closes the game log and returns the GameResult.
+        '''
         self.log.append('')
         self.log.append('Final' + STATUS(players))
+        self.log.append('Luck-adjusted' + STATUS_ADJUSTED(self.adjusted_bankrolls))
+        self.bankrolls = {player.name: player.bankroll for player in players}
+        if not self.quiet:
+            print('Writing', self.log.name)
+        self.log.close()
+        if self.checkpoint_file is not None:
+            self.checkpoint_file.close()
+        self.result = GameResult(self.bankrolls, self.deltas,
+                                 {player.name: player.timeouts for player in players},
+                                 {player.name: player.illegal_actions for player in players},
+                                 self.adjusted_bankrolls,
+                                 {player.name: player.latency_summaries() for player in players})
+        write_latency_summaries(os.path.join(self.output_dir, GAME_LOG_FILENAME + self.log_suffix + '_latency.csv'),
+                                self.result.latencies)
+        if self.observers:
+            for observer in self.observers:
+                observer.on_match_end(self.result)
+        return self.result
+
+
+class TableSeat():
+    '''
+    One player's seat at one table of a multi-table match, with its own bankroll.
+    '''
+
+    def __init__(self, player, table):
+        self.player = player
+        self.name = player.name
+        self.table = table
+        self.bankroll = 0
+
+    @property
+    def latency(self):
+        return self.player.latency
+
+
+class MultiTableMatch():
+    '''
+    Plays num_tables independent games at once over one pair of pokerbot connections.
+    Every message is tagged with its table id; the skeleton runner keeps a game tree
+    and a Bot instance per table, so each process always has work queued.
+    '''
+
+    def __init__(self, num_tables, output_dir='.', seed=None, quiet=False):
+        self.output_dir = output_dir
+        self.quiet = quiet
+        self.games = [Game(output_dir, None if seed is None else seed + table, table=table, quiet=quiet)
+                      for table in range(num_tables)]
+        self.bankrolls = None
+        self.result = None
+        self.observers = []
+
+    def add_observer(self, observer):
+        '''
+        Registers an Observer with every table. It is told which table a round is
+        played on through the players passed to it, which are TableSeats.
+        '''
+        self.observers.append(observer)
+        for game in self.games:
+            game.add_observer(observer)
+
+    def query_players(self, players, batches):
+        '''
+        Sends each player its batch of table requests, both players working concurrently.
+        '''
+        if self.executor is None:
+            return [player.query_tables(batch) for player, batch in zip(players, batches)]
+        future = self.executor.submit(players[1].query_tables, batches[1])
+        actions = players[0].query_tables(batches[0])
+        return [actions, future.result()]
+
+    def run(self, players=None):
+        '''
+        Runs one game on every table, round by round, and returns a GameResult
+        whose per-round deltas are summed over the tables.
+        Players are reused and left running if given, as in Game.run.
+        Only the Python skeleton dispatches table ids, so any other pokerbot plays the first table alone.
+        '''
+        paths = [PLAYER_1_PATH, PLAYER_2_PATH] if players is None else [player.path for player in players]
+        if len(self.games) > 1 and not all(is_python_bot(path) for path in paths):
+            print('Multi-table play needs both pokerbots on the Python skeleton - playing one table')
+            self.result = self.games[0].run(players)
+            self.bankrolls = self.games[0].bankrolls
+            return self.result
+        if not self.quiet:
+            print('Starting the Pokerbots engine with', len(self.games), 'tables...')
+        persistent = players is not None
+        players = prepare_players(players, self.output_dir, self.quiet)
         for player in players:
-            player.stop()
-        name = GAME_LOG_FILENAME + '.txt'
-        print('Writing', name)
-        with open(name, 'w') as log_file:
-            log_file.write('\n'.join(self.log))
+            # the pokerbot's clock covers its decisions on every table
+            player.game_clock = STARTING_GAME_CLOCK * len(self.games)
+            player.wall_clock = CPU_GAME_CLOCK_WALL_CAP * len(self.games)
+        self.executor = None
+        if not any(isinstance(player, LocalPlayer) for player in players):
+            self.executor = ThreadPoolExecutor(max_workers=1)
+        seats = [[TableSeat(player, table) for player in players] for table in range(len(self.games))]
+        for game in self.games:
+            game.concurrent_auction = CONCURRENT_QUERIES
+        for round_num in range(1, NUM_ROUNDS + 1):
+            rounds = {}
+            for table, game in enumerate(self.games):
+                game.log.append('')
+                game.log.append('Round #' + str(round_num) + STATUS(seats[table]))
+                round_generator = game.play_round(seats[table], round_num)
+                rounds[table] = (round_generator, next(round_generator))
+            while rounds:
+                batches = [[], []]
+                for table, (_, requests) in rounds.items():
+                    game = self.games[table]
+                    for seat, round_state in requests:
+                        index = players.index(seats[table][seat].player)
+                        batches[index].append((table, round_state, game.player_messages[seat], game.log))
+                actions = [iter(player_actions) for player_actions in self.query_players(players, batches)]
+                for table, (round_generator, requests) in list(rounds.items()):
+                    table_actions = [next(actions[players.index(seats[table][seat].player)]) for seat, _ in requests]
+                    try:
+                        rounds[table] = (round_generator, round_generator.send(table_actions))
+                    except StopIteration:
+                        del rounds[table]
+            for table, game in enumerate(self.games):
+                seats[table] = seats[table][::-1]
+                if round_num % GAME_LOG_FLUSH_ROUNDS == 0:
+                    game.log.flush()
+        self.bankrolls = {player.name: 0 for player in players}
+        for table, game in enumerate(self.games):
+            game.log.append('')
+            game.log.append('Final' + STATUS(seats[table]))
+            game.log.append('Luck-adjusted' + STATUS_ADJUSTED(game.adjusted_bankrolls))
+            game.bankrolls = {seat.name: seat.bankroll for seat in seats[table]}
+            for seat in seats[table]:
+                self.bankrolls[seat.name] += seat.bankroll
+            game.log.close()
+        for player in players:
+            player.bankroll = self.bankrolls[player.name]
+        if self.executor is not None:
+            self.executor.shutdown()
+        if not persistent:
+            for player in players:
+                player.stop()
+        adjusted_bankrolls = {name: sum(game.adjusted_bankrolls[name] for game in self.games) for name in self.bankrolls}
+        if not self.quiet:
+            print('Multi-table result' + STATUS_TOTALS(self.bankrolls) + ', luck-adjusted' + STATUS_ADJUSTED(adjusted_bankrolls))
+        deltas = {name: [sum(round_deltas) for round_deltas in zip(*(game.deltas.get(name, []) for game in self.games))]
+                  for name in self.bankrolls}
+        self.result = GameResult(self.bankrolls, deltas,
+                                 {player.name: player.timeouts for player in players},
+                                 {player.name: player.illegal_actions for player in players},
+                                 adjusted_bankrolls,
+                                 {player.name: player.latency_summaries() for player in players})
+        write_latency_summaries(os.path.join(self.output_dir, GAME_LOG_FILENAME + '_latency.csv'), self.result.latencies)
+        if self.observers:
+            for observer in self.observers:
+                observer.on_match_end(self.result)
+        return self.result
+
+
+def run_duplicate(seed=None, output_dir='.', players=None):
+    '''
+    Plays duplicate poker: one game on a seeded deck sequence, then the same
+    sequence again with seats swapped, so that card luck cancels out.
+    Returns each player's bankroll summed over both games.
+    '''
+    if seed is None:
+        seed = random.randrange(2 ** 32)
+    games = [Game(output_dir, seed), Game(output_dir, seed, swap_seats=True)]
+    for game in games:
+        game.run(players)
+    paired = {name: sum(game.bankrolls[name] for game in games) for name in games[0].bankrolls}
+    print('Duplicate result for seed ' + str(seed) + STATUS_TOTALS(paired))
+    return paired
+
+
+def run_many(num_games, output_dir='.', seed=None, players=None, reuse=True):
+    '''
+    Plays num_games games quietly against one pair of pokerbot processes and
+    returns their GameResults. Game i writes its log to output_dir/game_i,
+    and with a seed it plays the deck sequence of seed + i.
+    Without reuse, every game starts its own pokerbots, which write their logs to output_dir/game_i.
+    '''
+    # with neither players nor reuse, players stays None and each Game.run starts and stops its own
+    owned = reuse and players is None
+    if owned:
+        players = start_players(output_dir, quiet=True)
+    results = []
+    try:
+        for i in range(1, num_games + 1):
+            game_dir = os.path.join(output_dir, 'game_' + str(i))
+            os.makedirs(game_dir, exist_ok=True)
+            results.append(Game(game_dir, None if seed is None else seed + i, quiet=True).run(players))
+    finally:
+        if owned:
+            for player in players:
+                player.stop()
+    return results
 
 
 if __name__ == '__main__':
-    Game().run()
+    if DUPLICATE_MODE:
+        run_duplicate(GAME_SEED)
+    elif NUM_TABLES > 1:
+        MultiTableMatch(NUM_TABLES, seed=GAME_SEED).run()
+    else:
+        Game(seed=GAME_SEED).run()
@@ -1,45 +1,65 @@
 import os
-import contextlib
-import matplotlib
-import re
-import itertools
-from engine import Game
+import random
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from config import PLAYER_1_NAME, PLAYER_2_NAME
+from engine import run_many
 from tqdm import tqdm
 import matplotlib.pyplot as plt
 
 
 NUM_ITERS = 50
-results = []
+# MATCHES RUN CONCURRENTLY, ONE PER WORKER PROCESS
+NUM_WORKERS = os.cpu_count()
+# EACH MATCH'S gamelog.txt, A.txt AND B.txt GO TO OUTPUT_DIR/worker_#/game_#
+OUTPUT_DIR = 'matches'
+# KEEP ONE PAIR OF BOT PROCESSES PER WORKER FOR ALL OF ITS MATCHES (THEIR A.txt AND B.txt GO TO
+# OUTPUT_DIR/worker_#) INSTEAD OF STARTING FRESH ONES FOR EVERY MATCH
+REUSE_BOT_PROCESSES = False
 
-for _ in tqdm(range(NUM_ITERS)):
-	#Run Engine with print() output suppressed
-	with open(os.devnull, 'w') as devnull:
-		with contextlib.redirect_stdout(devnull):
-			Game().run()
 
-	#Get Last File Line
-	with open('gamelog.txt') as f:
-		for line in f:
-			pass
-		last_line = line
+def run_matches(worker_num, num_matches):
+	'''
+	Runs several games and returns their GameResults, on one pair of long-lived bot processes
+	if REUSE_BOT_PROCESSES is set. Every engine binds its own ephemeral ports, so workers never collide.
+	'''
+	return run_many(num_matches, os.path.join(OUTPUT_DIR, 'worker_' + str(worker_num)), reuse=REUSE_BOT_PROCESSES)
 
-	#Parse Last File Line
-	scores = re.findall(r'-?\d+', line)
-	results.append({'A':int(scores[0]), 'B':int(scores[1])})
 
-a_wins = sum(1 for x in results if x['A'] > x['B'])
-b_wins = NUM_ITERS - a_wins
+def main():
+	chunks = [len(range(i, NUM_ITERS, NUM_WORKERS)) for i in range(NUM_WORKERS) if i < NUM_ITERS]
+	results = []
+	# reseed each worker, since forked workers would otherwise shuffle identical decks
+	with ProcessPoolExecutor(max_workers=NUM_WORKERS, initializer=random.seed) as pool:
+		futures = [pool.submit(run_matches, worker_num, chunk) for worker_num, chunk in enumerate(chunks, 1)]
+		with tqdm(total=NUM_ITERS) as progress:
+			for future in as_completed(futures):
+				results.extend(future.result())
+				progress.update(len(future.result()))
 
-a_scores = [x['A'] for x in results]
-plt.hist(a_scores, density=True, bins=50)
-plt.savefig('hist_a.png')
-# plt.show()
+	a_wins = sum(1 for x in results if x.bankrolls[PLAYER_1_NAME] > x.bankrolls[PLAYER_2_NAME])
+	b_wins = NUM_ITERS - a_wins
 
-# plt.clf()
+	a_scores = [x.bankrolls[PLAYER_1_NAME] for x in results]
+	plt.hist(a_scores, density=True, bins=50)
+	plt.savefig('hist_a.png')
+	# plt.show()
 
-# b_scores = [x['B'] for x in results]
-# plt.hist(b_scores, density=True, bins=50)
-# plt.savefig('hist_b.png')
+	# plt.clf()
 
+	# b_scores = [x.bankrolls[PLAYER_2_NAME] for x in results]
+	# plt.hist(b_scores, density=True, bins=50)
+	# plt.savefig('hist_b.png')
 
-print(f"A won {a_wins} times. B won {b_wins} times.")
\ No newline at end of file
+	print(f"{PLAYER_1_NAME} won {a_wins} times. {PLAYER_2_NAME} won {b_wins} times.")
+	print(f"{PLAYER_1_NAME} total bankroll {sum(a_scores)}, mean {sum(a_scores) / NUM_ITERS:.1f} per match.")
+	a_adjusted = sum(x.adjusted_bankrolls[PLAYER_1_NAME] for x in results)
+	print(f"{PLAYER_1_NAME} luck-adjusted total {a_adjusted:.1f}, mean {a_adjusted / NUM_ITERS:.1f} per match.")
+	for name in (PLAYER_1_NAME, PLAYER_2_NAME):
+		timeouts = sum(x.timeouts[name] for x in results)
+		illegal_actions = sum(x.illegal_actions[name] for x in results)
+		if timeouts or illegal_actions:
+			print(f"{name} timed out {timeouts} times and attempted {illegal_actions} illegal actions.")
+
+
+if __name__ == '__main__':
+	main()
@@ -10,6 +10,10 @@ import random
 import eval7
 import pickle
 
+# read once per process, however many times the runner constructs a Player
+with open("hand_strengths.pkl", "rb") as file:
+    STARTING_STRENGTHS = pickle.load(file)
+
 
 class Player(Bot):
     """
@@ -31,8 +35,7 @@ class Player(Bot):
         self.bluff_threshold = 0.1
         self.raise_mult = 1.5
 
-        with open("hand_strengths.pkl", "rb") as file:
-            self.starting_strengths = pickle.load(file)
+        self.starting_strengths = STARTING_STRENGTHS
 
     def handle_new_round(self, game_state, round_state, active):
         """
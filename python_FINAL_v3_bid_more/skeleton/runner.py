@@ -14,9 +14,10 @@ class Runner():
     Interacts with the engine.
     '''
 
-    def __init__(self, pokerbot, socketfile):
+    def __init__(self, pokerbot, socketfile, sendfile):
         self.pokerbot = pokerbot
         self.socketfile = socketfile
+        self.sendfile = sendfile
 
     def receive(self):
         '''
@@ -42,8 +43,8 @@ class Runner():
             code = 'A' + str(action.amount)
         else:  # isinstance(action, RaiseAction)
             code = 'R' + str(action.amount)
-        self.socketfile.write(code + '\n')
-        self.socketfile.flush()
+        self.sendfile.write(code + '\n')
+        self.sendfile.flush()
 
     def run(self):
         '''
@@ -53,10 +54,19 @@ class Runner():
         round_state = None
         active = 0
         round_flag = True
+        # multi-table matches tag each message with its table, which keeps its own pokerbot and game tree
+        tables = {}
+        table = 0
         for packet in self.receive():
             # print(packet)
             for clause in packet:
-                if clause[0] == 'T':
+                if clause[0] == 'I':
+                    tables[table] = (self.pokerbot, game_state, round_state, active, round_flag)
+                    table = int(clause[1:])
+                    if table not in tables:
+                        tables[table] = (type(self.pokerbot)(), GameState(0, 0., 1), None, 0, True)
+                    self.pokerbot, game_state, round_state, active, round_flag = tables[table]
+                elif clause[0] == 'T':
                     game_state = GameState(game_state.bankroll, float(clause[1:]), game_state.round_num)
                 elif clause[0] == 'P':
                     active = int(clause[1:])
@@ -110,12 +120,20 @@ class Runner():
                     self.pokerbot.handle_round_over(game_state, round_state, active)
                     game_state = GameState(game_state.bankroll, game_state.game_clock, game_state.round_num + 1)
                     round_flag = True
+                elif clause[0] == 'G':
+                    # a fresh pokerbot starts the game, so nothing it learned in the last one carries over
+                    self.pokerbot = type(self.pokerbot)()
+                    game_state = GameState(0, 0., 1)
+                    round_state = None
+                    round_flag = True
+                    tables = {}
                 elif clause[0] == 'Q':
                     return
             if round_flag:  # ack the engine
                 self.send(CheckAction())
             else:
-                assert active == round_state.button % 2
+                # with concurrent auction queries, both players are asked to bid before either bid is known
+                assert active == round_state.button % 2 or round_state.auction
                 action = self.pokerbot.get_action(game_state, round_state, active)
                 self.send(action)
 
@@ -126,21 +144,40 @@ def parse_args():
     '''
     parser = argparse.ArgumentParser(prog='python3 player.py')
     parser.add_argument('--host', type=str, default='localhost', help='Host to connect to, defaults to localhost')
-    parser.add_argument('port', type=int, help='Port on host to connect to')
+    parser.add_argument('port', type=str, help='Port on host to connect to, or unix:<path> or fd:<socket> from the engine')
     return parser.parse_args()
 
+def connect(args):
+    '''
+    Connects to the engine over the transport it asked for.
+    '''
+    if args.port.startswith('unix:'):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(args.port[len('unix:'):])
+    elif args.port.startswith('fd:'):
+        # a socket inherited from the engine is already connected, so say we are ready
+        sock = socket.socket(fileno=int(args.port[len('fd:'):]))
+        sock.sendall(b'K\n')
+    else:
+        sock = socket.create_connection((args.host, int(args.port)))
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    return sock
+
 def run_bot(pokerbot, args):
     '''
     Runs the pokerbot.
     '''
     assert isinstance(pokerbot, Bot)
     try:
-        sock = socket.create_connection((args.host, args.port))
-    except OSError:
+        sock = connect(args)
+    except (OSError, ValueError):
         print('Could not connect to {}:{}'.format(args.host, args.port))
         return
-    socketfile = sock.makefile('rw')
-    runner = Runner(pokerbot, socketfile)
+    # separate files, since writing to a text 'rw' file discards any lines already read ahead
+    socketfile = sock.makefile('r')
+    sendfile = sock.makefile('w')
+    runner = Runner(pokerbot, socketfile, sendfile)
     runner.run()
     socketfile.close()
+    sendfile.close()
     sock.close()
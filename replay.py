@@ -0,0 +1,175 @@
+'''
+Counterfactual replay of recorded matches.
+
+A match played with a MatchRecorder attached stores every round's full deck and
+action history. ReplayGame deals the same decks to a new version of a pokerbot and
+reuses the opponent's recorded decisions for as long as the action history matches
+the recording. Once a round diverges, the live opponent is queried for the rest of it,
+so only the hands the new version plays differently can change their outcome.
+
+    python3 replay.py record match.jsonl    plays a match per config.py and records it
+    python3 replay.py replay match.jsonl    replays PLAYER_1 against PLAYER_2's recorded decisions
+'''
+import argparse
+import json
+import os
+import eval7
+
+from config import PLAYER_2_NAME, GAME_SEED, NUM_ROUNDS
+from engine import Game, Observer, RoundState, DECODE, CHECK_ONLY
+
+ENCODE = {action: code for code, action in DECODE.items()}
+
+
+def encode(action):
+    '''
+    Encodes an action as in the socket protocol.
+    '''
+    code = ENCODE[type(action)]
+    return code + str(action.amount) if code in ('R', 'A') else code
+
+
+def decode(code):
+    '''
+    Decodes an action encoded by encode.
+    '''
+    action = DECODE[code[0]]
+    return action(int(code[1:])) if code[0] in ('R', 'A') else action()
+
+
+class MatchRecorder(Observer):
+    '''
+    Records the deck and the actions of every round and writes them, one JSON line per round,
+    when the match ends. Forced checks are left out, since a replay reproduces them.
+    Each round's deltas are taken from the bankrolls, so they are recorded under SOAK_MODE too.
+    '''
+
+    def __init__(self, path):
+        self.path = path
+        self.rounds = []
+        self.bankrolls = []
+
+    def on_round_start(self, round_num, players, round_state):
+        # the hole cards were dealt off the top of the deck
+        deck = round_state.hands[0] + round_state.hands[1] + round_state.deck.cards
+        self.rounds.append({'round': round_num, 'seats': [player.name for player in players],
+                            'deck': [str(card) for card in deck], 'actions': []})
+        self.bankrolls.append({player.name: player.bankroll for player in players})
+
+    def on_action(self, player, action, round_state, latency):
+        if round_state.legal_actions() is not CHECK_ONLY:
+            record = self.rounds[-1]
+            record['actions'].append([record['seats'].index(player.name), encode(action)])
+
+    def on_match_end(self, result):
+        # a round's deltas are how far the bankrolls have moved by the start of the next one
+        ends = self.bankrolls[1:] + [result.bankrolls]
+        with open(self.path, 'w') as record_file:
+            for record, start, end in zip(self.rounds, self.bankrolls, ends):
+                record['deltas'] = {name: end[name] - bankroll for name, bankroll in start.items()}
+                record_file.write(json.dumps(record) + '\n')
+
+
+def load_records(path):
+    '''
+    Reads the rounds written by a MatchRecorder.
+    '''
+    with open(path) as record_file:
+        return [json.loads(line) for line in record_file if line.strip()]
+
+
+class ReplayGame(Game):
+    '''
+    Replays a recorded match, dealing its decks and standing in for the opponent
+    with its recorded actions until a round's history diverges from the recording.
+    Rounds beyond the end of the recording are played live on fresh decks.
+    '''
+
+    def __init__(self, records, opponent=PLAYER_2_NAME, output_dir='.', quiet=False):
+        super().__init__(output_dir, quiet=quiet)
+        self.records = records
+        self.opponent = opponent
+        # the deltas of every round that diverged, by round number
+        self.diverged_rounds = {}
+
+    def new_deck(self, round_num):
+        if round_num > len(self.records):
+            return super().new_deck(round_num)
+        deck = eval7.Deck()
+        deck.cards = [eval7.Card(card) for card in self.records[round_num - 1]['deck']]
+        return deck
+
+    def run_round(self, players, round_num):
+        '''
+        Runs one round of poker (1 hand), answering for the opponent from the recording
+        while every action so far matches it. Queries are always sequential.
+        '''
+        record = self.records[round_num - 1] if round_num <= len(self.records) else None
+        # a round played from other seats saw other cards, so nothing in it can be reused
+        diverged = record is None or record['seats'] != [player.name for player in players]
+        recorded = [] if diverged else record['actions']
+        position = 0
+        bankrolls = [player.bankroll for player in players]
+        round_generator = self.play_round(players, round_num)
+        requests = next(round_generator)
+        while True:
+            actions = [None] * len(requests)
+            # sealed bids are recorded in the order the sequential engine asks for them
+            for i in reversed(range(len(requests))):
+                seat, round_state = requests[i]
+                player = players[seat]
+                if not isinstance(round_state, RoundState):  # end of round ack
+                    actions[i] = player.query(round_state, self.player_messages[seat], self.log)
+                    continue
+                expected = recorded[position] if position < len(recorded) else None
+                if not diverged and player.name == self.opponent and expected is not None and expected[0] == seat:
+                    actions[i] = decode(expected[1])
+                    player.latency = None
+                    position += 1
+                    continue
+                actions[i] = player.query(round_state, self.player_messages[seat], self.log)
+                if not diverged and expected == [seat, encode(actions[i])]:
+                    position += 1
+                else:
+                    diverged = True
+            try:
+                requests = round_generator.send(actions)
+            except StopIteration:
+                break
+        if diverged:
+            self.diverged_rounds[round_num] = {player.name: player.bankroll - bankroll
+                                               for player, bankroll in zip(players, bankrolls)}
+
+    def run(self, players=None):
+        '''
+        Replays the match, prints how the diverged rounds compare with the recording
+        and returns the GameResult.
+        '''
+        result = super().run(players)
+        diverged = [round_num for round_num in self.diverged_rounds if round_num <= len(self.records)]
+        print('Replayed', min(NUM_ROUNDS, len(self.records)), 'recorded rounds,', len(diverged), 'diverged')
+        for name in result.bankrolls:
+            recorded = sum(self.records[round_num - 1]['deltas'][name] for round_num in diverged)
+            replayed = sum(self.diverged_rounds[round_num][name] for round_num in diverged)
+            print('{} on diverged rounds: recorded {}, replayed {} ({:+})'.format(name, recorded, replayed, replayed - recorded))
+        return result
+
+
+def main():
+    parser = argparse.ArgumentParser(prog='python3 replay.py')
+    parser.add_argument('mode', choices=['record', 'replay'])
+    parser.add_argument('path', help='Match record, one JSON line per round')
+    parser.add_argument('--opponent', default=PLAYER_2_NAME, help='Player whose recorded decisions are reused')
+    parser.add_argument('--output-dir', default='replay', help='Where the replay writes its logs')
+    args = parser.parse_args()
+    if args.mode == 'record':
+        game = Game(seed=GAME_SEED)
+        game.add_observer(MatchRecorder(args.path))
+        game.run()
+    else:
+        os.makedirs(args.output_dir, exist_ok=True)
+        ReplayGame(load_records(args.path), args.opponent, args.output_dir).run()
+
+
+if __name__ == '__main__':
+    main()
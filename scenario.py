@@ -0,0 +1,162 @@
+'''
+Scenario mode for playing one targeted spot over and over.
+
+A scenario file is a JSON object that fixes any of the hole cards, the board and the
+auction cards, and a scripted line of actions in the socket protocol's codes that
+leads from the blinds to the spot. Every round deals the fixed cards (the rest at
+random), plays the scripted actions without asking the pokerbots, and then lets them
+play the spot out. Stacks, pips, bids and the auction result follow from the script,
+so the pokerbots see the same messages as in a full match. For example, a flop
+after a contested auction:
+
+    {"hands": [["Ah", "Kd"], ["7c", "7d"]], "board": ["Qs", "Jh", "2c"],
+     "actions": "R6 C A25 A30"}
+
+hands are by seat; seat 0 posts the small blind and the players swap seats every round.
+auction_cards optionally fixes the card the auction winner gets, then the card the
+other player gets on a tie.
+
+    python3 scenario.py spot.json    plays NUM_ROUNDS rounds of the spot per config.py
+'''
+import argparse
+import json
+import os
+import sys
+import time
+import eval7
+
+from config import *
+from engine import Game, RoundState, TerminalState, DECODE, CHECK_ONLY, CheckAction, RaiseAction, BidAction, STREET_NAMES
+
+
+def load_scenario(path):
+    '''
+    Reads a scenario file, raising ValueError if its cards or actions are misformatted.
+    '''
+    with open(path) as scenario_file:
+        scenario = json.load(scenario_file)
+    hands = [[eval7.Card(card) for card in hand or []] for hand in scenario.get('hands', [[], []])]
+    board = [eval7.Card(card) for card in scenario.get('board', [])]
+    auction_cards = [eval7.Card(card) for card in scenario.get('auction_cards', [])]
+    if len(hands) != 2 or any(len(hand) not in (0, 2) for hand in hands):
+        raise ValueError('hands must give two cards or none for each seat')
+    if len(board) > 5 or len(auction_cards) > 2:
+        raise ValueError('at most 5 board cards and 2 auction cards can be fixed')
+    fixed = hands[0] + hands[1] + board + auction_cards
+    if len(set(fixed)) != len(fixed):
+        raise ValueError('a card is fixed more than once')
+    actions = scenario.get('actions', '')
+    actions = actions.split() if isinstance(actions, str) else actions
+    script = [DECODE[code[0]](int(code[1:])) if code[0] in ('R', 'A') else DECODE[code[0]]() for code in actions]
+    check_script(script)
+    return hands, board, auction_cards, script
+
+
+def check_script(script):
+    '''
+    Plays the scripted actions from the blinds, raising ValueError unless each is legal
+    and the round is still going after the last one. Forced checks are not scripted.
+    '''
+    deck = eval7.Deck()
+    hands = [deck.deal(2), deck.deal(2)]
+    pips = [SMALL_BLIND, BIG_BLIND]
+    stacks = [STARTING_STACK - SMALL_BLIND, STARTING_STACK - BIG_BLIND]
+    round_state = RoundState(0, 0, False, [None, None], pips, stacks, hands, deck)
+    for i, action in enumerate(script):
+        while round_state.legal_actions() is CHECK_ONLY:
+            round_state = round_state.proceed(CheckAction())
+            if isinstance(round_state, TerminalState):
+                raise ValueError('the round is over before scripted action ' + str(i + 1))
+        if type(action) not in round_state.legal_actions():
+            raise ValueError('scripted action ' + str(i + 1) + ' is not legal')
+        if isinstance(action, RaiseAction):
+            min_raise, max_raise = round_state.raise_bounds()
+            if not min_raise <= action.amount <= max_raise:
+                raise ValueError('scripted raise ' + str(i + 1) + ' is out of bounds')
+        if isinstance(action, BidAction):
+            min_bid, max_bid = round_state.bid_bounds()
+            if not min_bid <= action.amount <= max_bid:
+                raise ValueError('scripted bid ' + str(i + 1) + ' is out of bounds')
+        round_state = round_state.proceed(action)
+        if isinstance(round_state, TerminalState):
+            raise ValueError('the scripted actions end the round')
+
+
+class ScenarioGame(Game):
+    '''
+    Plays every round from a scenario's spot: its fixed cards are dealt and its
+    scripted actions are taken for whoever is to act before the pokerbots are queried.
+    '''
+
+    def __init__(self, scenario, output_dir='.', seed=None, quiet=False):
+        super().__init__(output_dir, seed, quiet=quiet)
+        self.hands, self.board, self.auction_cards, self.script = scenario
+
+    def new_deck(self, round_num):
+        fixed = set(self.hands[0] + self.hands[1] + self.board + self.auction_cards)
+        cards = [card for card in eval7.Deck().cards if card not in fixed]
+        self.rng.shuffle(cards)
+        hands = [hand if hand else [cards.pop(), cards.pop()] for hand in self.hands]
+        board = self.board + [cards.pop() for _ in range(5 - len(self.board))]
+        # the auction cards are the last two of the 48 left after dealing hole cards, the winner's last
+        auction_cards = self.auction_cards + [cards.pop() for _ in range(2 - len(self.auction_cards))]
+        deck = eval7.Deck()
+        deck.cards = hands[0] + hands[1] + board + cards + auction_cards[::-1]
+        return deck
+
+    def run_round(self, players, round_num):
+        '''
+        Runs one round of poker (1 hand), taking the scripted actions before querying anyone.
+        '''
+        position = 0
+        round_generator = self.play_round(players, round_num)
+        requests = next(round_generator)
+        while True:
+            if position < len(self.script) and isinstance(requests[0][1], RoundState):
+                actions = [None] * len(requests)
+                # concurrent sealed bids are taken in the order the sequential engine asks for them
+                for i in reversed(range(len(requests))):
+                    seat, round_state = requests[i]
+                    if position < len(self.script):
+                        actions[i] = self.script[position]
+                        players[seat].latency = None
+                        position += 1
+                    else:
+                        actions[i] = players[seat].query(round_state, self.player_messages[seat], self.log)
+            elif len(requests) == 1:
+                seat, round_state = requests[0]
+                actions = [players[seat].query(round_state, self.player_messages[seat], self.log)]
+            else:
+                actions = self.query_both(players, [round_state for _, round_state in requests])
+            try:
+                requests = round_generator.send(actions)
+            except StopIteration:
+                return
+
+
+def main():
+    parser = argparse.ArgumentParser(prog='python3 scenario.py')
+    parser.add_argument('path', help='Scenario file, a JSON object')
+    parser.add_argument('--output-dir', default='.', help='Where the scenario writes its logs')
+    args = parser.parse_args()
+    try:
+        scenario = load_scenario(args.path)
+    except (OSError, KeyError, IndexError, TypeError, ValueError) as error:
+        print('Could not load scenario', args.path, '-', error)
+        sys.exit(1)
+    os.makedirs(args.output_dir, exist_ok=True)
+    start_time = time.perf_counter()
+    result = ScenarioGame(scenario, args.output_dir, GAME_SEED).run()
+    elapsed = time.perf_counter() - start_time
+    print('Played the spot', NUM_ROUNDS, 'times in {:.1f}s ({:.2f} ms per round)'.format(elapsed, 1000 * elapsed / NUM_ROUNDS))
+    for name, bankroll in result.bankrolls.items():
+        print('{} won {:+.2f} per round, luck-adjusted {:+.2f}'.format(name, bankroll / NUM_ROUNDS,
+                                                                      result.adjusted_bankrolls[name] / NUM_ROUNDS))
+        for (street, decision, action), summary in sorted(result.latencies[name].items()):
+            if street in STREET_NAMES + ['Preflop']:
+                print('  {} {} {}: {} decisions, p50 {:.3f} ms, p99 {:.3f} ms, max {:.3f} ms'.format(
+                    street, decision, action, summary.count, 1000 * summary.p50, 1000 * summary.p99, 1000 * summary.max))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+'''
+Tests for reusing pokerbot processes across games.
+
+    python3 -m pytest test_engine.py
+'''
+import os
+import shutil
+import pytest
+
+import engine
+
+# a deterministic pokerbot whose play depends on how many rounds its Player has seen,
+# so any state left over from an earlier game changes its first decisions
+COUNTING_PLAYER = """
+from skeleton.actions import FoldAction, CallAction, CheckAction, BidAction
+from skeleton.bot import Bot
+from skeleton.runner import parse_args, run_bot
+
+
+class Player(Bot):
+
+    def __init__(self):
+        self.rounds_seen = 0
+
+    def handle_new_round(self, game_state, round_state, active):
+        self.rounds_seen += 1
+
+    def handle_round_over(self, game_state, terminal_state, active):
+        pass
+
+    def get_action(self, game_state, round_state, active):
+        legal_actions = round_state.legal_actions()
+        if BidAction in legal_actions:
+            return BidAction(self.rounds_seen)
+        if self.rounds_seen > 3 and FoldAction in legal_actions:
+            return FoldAction()
+        return CallAction() if CallAction in legal_actions else CheckAction()
+
+
+if __name__ == '__main__':
+    run_bot(Player(), parse_args())
+"""
+
+
+@pytest.fixture
+def counting_bots(tmp_path, monkeypatch):
+    paths = []
+    for name in ('bot_a', 'bot_b'):
+        path = tmp_path / name
+        shutil.copytree(os.path.join(os.path.dirname(engine.__file__), 'python_skeleton', 'skeleton'), path / 'skeleton',
+                        ignore=shutil.ignore_patterns('__pycache__'))
+        shutil.copy(os.path.join(os.path.dirname(engine.__file__), 'python_skeleton', 'commands.json'), path)
+        (path / 'player.py').write_text(COUNTING_PLAYER)
+        paths.append(str(path))
+    monkeypatch.setattr(engine, 'PLAYER_1_PATH', paths[0])
+    monkeypatch.setattr(engine, 'PLAYER_2_PATH', paths[1])
+    monkeypatch.setattr(engine, 'NUM_ROUNDS', 6)
+    return tmp_path
+
+
+def read_log(path):
+    with open(path) as log_file:
+        return log_file.read()
+
+
+@pytest.mark.parametrize('in_process', [False, True])
+def test_reused_process_plays_like_a_fresh_one(counting_bots, monkeypatch, in_process):
+    monkeypatch.setattr(engine, 'IN_PROCESS_PLAYERS', in_process)
+    reused_dir = str(counting_bots / 'reused')
+    fresh_dir = str(counting_bots / 'fresh')
+    os.makedirs(fresh_dir)
+    # game 2 of run_many plays the deck sequence of seed + 2 on the processes game 1 used
+    engine.run_many(2, reused_dir, seed=10)
+    engine.Game(fresh_dir, seed=12, quiet=True).run()
+    reused_log = read_log(os.path.join(reused_dir, 'game_2', engine.GAME_LOG_FILENAME + '.txt'))
+    fresh_log = read_log(os.path.join(fresh_dir, engine.GAME_LOG_FILENAME + '.txt'))
+    assert reused_log == fresh_log